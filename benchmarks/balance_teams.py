@@ -0,0 +1,48 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import team_balancer
+
+ROSTERS = 2000
+
+def random_roster(size):
+    return [(player_id, random.randint(100, 1500)) for player_id in range(size)]
+
+def average_gap(split, roster):
+    mmrs = dict(roster)
+    team1, team2 = split
+    return team_balancer.average_difference(
+        team_balancer.team_of([mmrs[p] for p in team1]),
+        team_balancer.team_of([mmrs[p] for p in team2])
+    )
+
+def bench(name, size, func):
+    rosters = [random_roster(size) for _ in range(ROSTERS)]
+
+    start = time.perf_counter()
+    splits = [func(roster) for roster in rosters]
+    per_call = (time.perf_counter() - start) / ROSTERS
+
+    gap = sum(average_gap(split, roster) for split, roster in zip(splits, rosters)) / ROSTERS
+    print(f"{name:<28} {size:>3} players {per_call * 1_000_000:>9.1f} us/call   avg MMR gap {gap:>7.2f}")
+
+def main():
+    random.seed(1)
+    party = team_balancer.keep_together([(0, 1), (2, 3)])
+    variance = team_balancer.weighted(
+        (team_balancer.average_difference, 1.0),
+        (team_balancer.variance_difference, 0.25)
+    )
+
+    for size in (2, 4, 6, 10):
+        bench("greedy", size, team_balancer.greedy_split)
+        bench("exact", size, team_balancer.balance)
+    bench("exact + parties", 10, lambda roster: team_balancer.balance(roster, constraints=(party,)))
+    bench("exact + variance objective", 10, lambda roster: team_balancer.balance(roster, variance))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.database import DatabaseManager, DURABILITY_PROFILES
+from utils.mmr_system import MMRSystem
+
+STAT_COMMITS = 500
+MATCHES = 200
+JOURNAL_WRITES = 200
+
+async def measure(count, func):
+    start = time.perf_counter()
+    for i in range(count):
+        await func(i)
+    return count / (time.perf_counter() - start)
+
+async def bench_profile(profile, directory):
+    db = DatabaseManager(os.path.join(directory, f"{profile}.db"), flush_interval=3600, profile=profile)
+    await db.initialize()
+    mmr_system = MMRSystem(db)
+
+    stat_rate = await measure(
+        STAT_COMMITS,
+        lambda i: db.update_player_stats(i % 50, "r6", i % 2 == 0)
+    )
+    match_rate = await measure(
+        MATCHES,
+        lambda i: mmr_system.finalize_match(list(range(5)), list(range(5, 10)), 1 + i % 2, "r6", i)
+    )
+    journal_rate = await measure(
+        JOURNAL_WRITES,
+        lambda i: db.update_player_mmr(i % 50, "rl", 500 + i, "Benchmark")
+    )
+
+    await db.close()
+    return stat_rate, match_rate, journal_rate
+
+async def main():
+    print(f"{'profile':<10} {'commits/s':>12} {'matches/s':>12} {'journal/s':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in DURABILITY_PROFILES:
+            stat_rate, match_rate, journal_rate = await bench_profile(profile, directory)
+            print(f"{profile:<10} {stat_rate:>12.0f} {match_rate:>12.0f} {journal_rate:>12.0f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,6 +4,11 @@ from discord import app_commands
 from typing import Literal, Optional
 from utils.permissions import check_admin_permissions
 
+def format_bound(bound, scale=1, unit="s"):
+    if bound == float("inf"):
+        return "over the top bucket"
+    return f"≤{bound * scale:g}{unit}"
+
 class Admin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -54,6 +59,47 @@ class Admin(commands.Cog):
 
         await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
     
+    @app_commands.command(name="match-history", description="View recent matches for a player")
+    @app_commands.describe(
+        game="Game to view matches for",
+        user="User to view (leave blank for yourself)",
+        ephemeral="Whether to send as an ephemeral message (default: True)"
+    )
+    async def match_history(
+        self,
+        interaction: discord.Interaction,
+        game: Literal["r6", "rl", "valorant", "breachers"],
+        user: Optional[discord.Member] = None,
+        ephemeral: bool = True
+    ):
+        target_user = user if user else interaction.user
+        
+        matches = await self.bot.db.get_player_matches(target_user.id, game)
+        
+        game_names = {
+            "r6": "Rainbow Six Siege",
+            "rl": "Rocket League",
+            "valorant": "Valorant",
+            "breachers": "Breachers"
+        }
+        
+        embed = discord.Embed(
+            title=f"{target_user.display_name}'s Recent {game_names[game]} Matches",
+            color=discord.Color.blue()
+        )
+        
+        if not matches:
+            embed.description = "No matches played yet."
+        else:
+            lines = []
+            for match_id, queue_number, winner, created_at, team, mmr_before, mmr_delta in matches:
+                result = "Win" if winner == team else "Loss"
+                change = f" ({mmr_delta:+d} MMR)" if mmr_delta is not None else ""
+                lines.append(f"**Match #{queue_number}** - {result}{change} - {created_at[:16]}")
+            embed.description = "\n".join(lines)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
+    
     @app_commands.command(name="mmr-change", description="ADMIN: Change a player's MMR by an amount")
     @app_commands.describe(
         user="User to modify",
@@ -160,5 +206,137 @@ class Admin(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="mmr-recompute", description="ADMIN: Recompute a game's MMR from match history")
+    @app_commands.describe(
+        game="Game to recompute MMR for",
+        apply="Write the recomputed ratings back (default: False, dry run)"
+    )
+    async def mmr_recompute(
+        self,
+        interaction: discord.Interaction,
+        game: Literal["r6", "rl", "valorant", "breachers"],
+        apply: bool = False
+    ):
+        if not check_admin_permissions(interaction):
+            await interaction.response.send_message(
+                "You do not have the permissions to do this command.",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            summary = await self.bot.mmr_system.replay_ratings(game, apply=apply)
+        except RuntimeError as e:
+            await interaction.followup.send(str(e), ephemeral=True)
+            return
+        
+        if apply:
+            self.bot.leaderboard.invalidate(game)
+        
+        game_names = {
+            "r6": "Rainbow Six Siege",
+            "rl": "Rocket League",
+            "valorant": "Valorant",
+            "breachers": "Breachers"
+        }
+        
+        embed = discord.Embed(
+            title="MMR Recomputed" if apply else "MMR Recompute (Dry Run)",
+            description=f"Replayed {game_names[game]} match history",
+            color=discord.Color.green() if apply else discord.Color.blue()
+        )
+        
+        embed.add_field(name="Matches", value=str(summary['matches']), inline=True)
+        embed.add_field(name="Penalties", value=str(summary['penalties']), inline=True)
+        embed.add_field(name="Players", value=str(summary['players']), inline=True)
+        embed.add_field(name="Differs From Current", value=str(summary['changed']), inline=True)
+        embed.add_field(name="Time", value=f"{summary['seconds']:.3f}s", inline=True)
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="bot-stats", description="ADMIN: View queue, match, database and Discord health")
+    async def stats_command(self, interaction: discord.Interaction):
+        if not check_admin_permissions(interaction):
+            await interaction.response.send_message(
+                "You do not have the permissions to do this command.",
+                ephemeral=True
+            )
+            return
+        
+        metrics = self.bot.metrics
+        embed = discord.Embed(
+            title="Bot Stats",
+            description="Counts since the last restart. Times are averages with the 95th percentile bucket in brackets.",
+            color=discord.Color.blue()
+        )
+        
+        depths = metrics.summary("multiverse_queue_depth")
+        pops = metrics.summary("multiverse_time_to_pop_seconds")
+        queue_lines = []
+        for series, depth in depths.items():
+            line = f"**{series}:** {depth} waiting"
+            if series in pops:
+                line += f", pop {pops[series]['avg']:.0f}s ({format_bound(pops[series]['p95'])}) over {pops[series]['count']} players"
+            queue_lines.append(line)
+        embed.add_field(name="Queues", value='\n'.join(queue_lines) or "No queues", inline=False)
+        
+        ready_totals = {}
+        for series, count in metrics.summary("multiverse_ready_checks_total").items():
+            game, mode, outcome = series.split("/")
+            ready_totals.setdefault(f"{game}/{mode}", {})[outcome] = count
+        durations = metrics.summary("multiverse_match_duration_seconds")
+        match_lines = []
+        for series in sorted(set(ready_totals) | set(durations)):
+            outcomes = ready_totals.get(series, {})
+            total = sum(outcomes.values())
+            line = f"**{series}:**"
+            if total:
+                line += f" {outcomes.get('complete', 0) / total * 100:.0f}% of {total} ready checks passed"
+            if series in durations:
+                line += f", {durations[series]['count']} played, {durations[series]['avg'] / 60:.0f}m long"
+            match_lines.append(line)
+        embed.add_field(name="Matches", value='\n'.join(match_lines) or "No matches yet", inline=False)
+        
+        db_calls = metrics.summary("multiverse_db_call_seconds")
+        slowest = sorted(db_calls.items(), key=lambda item: item[1]['avg'], reverse=True)[:5]
+        db_lines = [
+            f"**{method}:** {stats['avg'] * 1000:.1f}ms ({format_bound(stats['p95'], 1000, 'ms')}), {stats['count']} calls"
+            for method, stats in slowest
+        ]
+        embed.add_field(name="Slowest Database Calls", value='\n'.join(db_lines) or "No calls yet", inline=False)
+        
+        rest_calls = metrics.summary("multiverse_rest_request_seconds")
+        rest_lines = [
+            f"**{priority}:** {stats['avg'] * 1000:.0f}ms ({format_bound(stats['p95'], 1000, 'ms')}), {stats['count']} calls"
+            for priority, stats in rest_calls.items()
+        ]
+        rest_lines.append(f"**Waiting:** {self.bot.rest.depth()}")
+        edits = metrics.summary("multiverse_message_edits_total")
+        rest_lines.append(f"**Message edits:** {edits.get('sent', 0)} sent for {edits.get('requested', 0)} updates")
+        embed.add_field(name="Discord REST", value='\n'.join(rest_lines), inline=True)
+        
+        lag = metrics.summary("multiverse_event_loop_lag_seconds").get("total")
+        autocomplete = self.bot.db.parties.stats()
+        pool = self.bot.channel_pool.stats()
+        health_lines = [
+            f"**Loop lag:** {lag['avg'] * 1000:.1f}ms ({format_bound(lag['p95'], 1000, 'ms')})" if lag else "**Loop lag:** not sampled yet",
+            f"**Party autocomplete:** {autocomplete['hit_rate']}% hits",
+            f"**Channel pool:** {pool['hits']} hits, {pool['misses']} misses"
+        ]
+        embed.add_field(name="Health", value='\n'.join(health_lines), inline=True)
+        
+        deadlines = self.bot.scheduler.pending()
+        deadline_counts = {}
+        for deadline in deadlines:
+            deadline_counts[deadline['kind']] = deadline_counts.get(deadline['kind'], 0) + 1
+        deadline_lines = [f"**{kind}:** {count}" for kind, count in sorted(deadline_counts.items())]
+        if deadlines:
+            deadline_lines.append(f"**Next:** {deadlines[0]['key']} <t:{int(deadlines[0]['due_at'])}:R>")
+        embed.add_field(name="Pending Deadlines", value='\n'.join(deadline_lines) or "None", inline=True)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(Admin(bot))
\ No newline at end of file
@@ -3,11 +3,14 @@ from discord.ext import commands
 from discord import app_commands
 
 class LeaderboardView(discord.ui.View):
-    def __init__(self, bot, players_data):
+    def __init__(self, bot, guild=None, game_type="r6"):
         super().__init__(timeout=300)
         self.bot = bot
-        self.players_data = players_data
-        self.game_type = "r6"
+        self.guild = guild
+        self.leaderboard = bot.leaderboard
+        self.game_type = game_type
+        self.page = 0
+        self.highlight = None
         self.game_names = {
             "r6": "Rainbow Six Siege",
             "rl": "Rocket League",
@@ -16,33 +19,37 @@ class LeaderboardView(discord.ui.View):
         }
 
     async def create_embed(self):
+        self.page, entries = self.leaderboard.page(self.game_type, self.page)
+        page_count = self.leaderboard.page_count(self.game_type)
+
         embed = discord.Embed(
-            title=f"{self.game_names[self.game_type]} - Top 10 Players",
+            title=f"{self.game_names[self.game_type]} Leaderboard",
             color=discord.Color.gold()
         )
+        embed.set_footer(text=f"Page {self.page + 1}/{page_count}")
 
-        top_players = self.players_data[self.game_type]
+        self.prev_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= page_count - 1
 
-        if not top_players:
+        if not entries:
             embed.description = "No players found for this game yet."
             return embed
 
-        for idx, (user_id, mmr) in enumerate(top_players, 1):
-            try:
-                user = await self.bot.fetch_user(user_id)
-                username = user.display_name
-                avatar_url = user.display_avatar.url
-            except:
-                username = "Unknown User"
-                avatar_url = None
+        profiles = await self.bot.profiles.resolve([user_id for _, user_id, _ in entries], self.guild)
+
+        for rank, user_id, mmr in entries:
+            profile = profiles.get(user_id)
+            username = profile['name'] if profile else "Unknown User"
+            avatar_url = profile['avatar_url'] if profile else None
 
+            marker = " ◄" if user_id == self.highlight else ""
             embed.add_field(
-                name=f"#{idx} - {username}",
+                name=f"#{rank} - {username}{marker}",
                 value=f"**MMR:** {mmr}",
                 inline=False
             )
 
-            if idx == 1 and avatar_url:
+            if rank == 1 and avatar_url:
                 embed.set_thumbnail(url=avatar_url)
 
         return embed
@@ -59,16 +66,37 @@ class LeaderboardView(discord.ui.View):
     )
     async def game_select(self, interaction: discord.Interaction, select: discord.ui.Select):
         self.game_type = select.values[0]
+        self.page = 0
+        self.highlight = None
         embed = await self.create_embed()
-        await interaction.response.edit_message(embed=embed)
+        await interaction.response.edit_message(embed=embed, view=self)
 
     @discord.ui.button(label="◄", style=discord.ButtonStyle.blurple, custom_id="leaderboard_prev")
     async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
+        self.page -= 1
+        embed = await self.create_embed()
+        await interaction.response.edit_message(embed=embed, view=self)
 
     @discord.ui.button(label="►", style=discord.ButtonStyle.blurple, custom_id="leaderboard_next")
     async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
+        self.page += 1
+        embed = await self.create_embed()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="My Rank", style=discord.ButtonStyle.gray, custom_id="leaderboard_my_rank")
+    async def my_rank(self, interaction: discord.Interaction, button: discord.ui.Button):
+        page = self.leaderboard.page_of(self.game_type, interaction.user.id)
+        if page is None:
+            await interaction.response.send_message(
+                f"You don't have a {self.game_names[self.game_type]} rating yet.",
+                ephemeral=True
+            )
+            return
+
+        self.page = page
+        self.highlight = interaction.user.id
+        embed = await self.create_embed()
+        await interaction.response.edit_message(embed=embed, view=self)
 
 
 class Leaderboard(commands.Cog):
@@ -79,14 +107,7 @@ class Leaderboard(commands.Cog):
     async def leaderboard(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        game_types = ["r6", "rl", "valorant", "breachers"]
-        players_data = {}
-
-        for game in game_types:
-            top_players = await self.bot.db.get_top_mmr_players(game, limit=10)
-            players_data[game] = top_players
-
-        view = LeaderboardView(self.bot, players_data)
+        view = LeaderboardView(self.bot, interaction.guild)
         embed = await view.create_embed()
 
         await interaction.followup.send(embed=embed, view=view)
@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from typing import List
+from utils.rest_scheduler import NORMAL
 
 class LeavePartyConfirmView(discord.ui.View):
     def __init__(self, bot, party_name, captain_id):
@@ -48,14 +49,10 @@ class Parties(commands.Cog):
             await interaction.response.send_message("Party name cannot exceed 20 characters!", ephemeral=True)
             return
         
-        existing_parties = await self.bot.db.get_created_parties(interaction.user.id)
-        
-        if name in existing_parties:
+        if not await self.bot.db.create_party(name, interaction.user.id):
             await interaction.response.send_message(f"You already have a party named **{name}**!", ephemeral=True)
             return
         
-        await self.bot.db.create_party(name, interaction.user.id)
-        
         embed = discord.Embed(
             title="Party Created",
             description=f"Successfully created party **{name}**!\nYou are the captain.",
@@ -70,9 +67,9 @@ class Parties(commands.Cog):
         party_name="Party to invite them to"
     )
     async def party_invite(self, interaction: discord.Interaction, user: discord.Member, party_name: str):
-        created_parties = await self.bot.db.get_created_parties(interaction.user.id)
+        party_members = await self.bot.db.get_party_members(party_name, interaction.user.id)
         
-        if party_name not in created_parties:
+        if not party_members:
             await interaction.response.send_message("You don't have a party with that name!", ephemeral=True)
             return
         
@@ -80,18 +77,14 @@ class Parties(commands.Cog):
             await interaction.response.send_message("You cannot invite yourself!", ephemeral=True)
             return
         
-        party_count = await self.bot.db.get_party_count(party_name, interaction.user.id)
-        
-        if party_count >= 2:
-            await interaction.response.send_message("This party is full! (Max 2 people)", ephemeral=True)
-            return
-        
-        party_members = await self.bot.db.get_party_members(party_name, interaction.user.id)
-        
         if user.id in party_members:
             await interaction.response.send_message(f"{user.mention} is already in this party!", ephemeral=True)
             return
         
+        if len(party_members) >= 2:
+            await interaction.response.send_message("This party is full! (Max 2 people)", ephemeral=True)
+            return
+        
         await self.bot.db.add_party_member(party_name, interaction.user.id, user.id)
         
         embed = discord.Embed(
@@ -108,31 +101,22 @@ class Parties(commands.Cog):
                 description=f"You have been added to party **{party_name}** by {interaction.user.mention}!",
                 color=discord.Color.blue()
             )
-            await user.send(embed=dm_embed)
+            await self.bot.rest.request(lambda: user.send(embed=dm_embed), NORMAL)
         except:
             pass
     
     @app_commands.command(name="party-leave", description="Leave a party")
     @app_commands.describe(name="Party to leave")
     async def party_leave(self, interaction: discord.Interaction, name: str):
-        user_parties = await self.bot.db.get_user_parties(interaction.user.id)
+        party = await self.bot.db.get_member_party(interaction.user.id, name)
         
-        party_found = False
-        captain_id = None
-        
-        for party_name, cap_id in user_parties:
-            if party_name == name:
-                party_found = True
-                captain_id = cap_id
-                break
-        
-        if not party_found:
+        if party is None:
             await interaction.response.send_message("You are not in a party with that name!", ephemeral=True)
             return
         
-        is_captain = await self.bot.db.is_party_captain(name, interaction.user.id)
+        captain_id, members = party
         
-        if is_captain:
+        if captain_id == interaction.user.id:
             embed = discord.Embed(
                 title="Confirm Party Deletion",
                 description="You created this party. Leaving it will delete the party and remove all people from it. Are you sure you want to leave?",
@@ -155,22 +139,13 @@ class Parties(commands.Cog):
     @app_commands.command(name="party-list", description="View members in a party")
     @app_commands.describe(name="Party to view")
     async def party_list(self, interaction: discord.Interaction, name: str):
-        user_parties = await self.bot.db.get_user_parties(interaction.user.id)
-        
-        party_found = False
-        captain_id = None
-        
-        for party_name, cap_id in user_parties:
-            if party_name == name:
-                party_found = True
-                captain_id = cap_id
-                break
+        party = await self.bot.db.get_member_party(interaction.user.id, name)
         
-        if not party_found:
+        if party is None:
             await interaction.response.send_message("You are not in a party with that name!", ephemeral=True)
             return
         
-        members = await self.bot.db.get_party_members(name, captain_id)
+        captain_id, members = party
         
         embed = discord.Embed(
             title=f"Party: {name}",
@@ -193,29 +168,18 @@ class Parties(commands.Cog):
     
     @party_invite.autocomplete('party_name')
     async def party_invite_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        parties = await self.bot.db.get_created_parties(interaction.user.id)
-        return [
-            app_commands.Choice(name=party, value=party)
-            for party in parties if current.lower() in party.lower()
-        ][:25]
+        parties = self.bot.db.parties.complete(interaction.user.id, current, created=True)
+        return [app_commands.Choice(name=party, value=party) for party in parties]
     
     @party_leave.autocomplete('name')
     async def party_leave_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        user_parties = await self.bot.db.get_user_parties(interaction.user.id)
-        party_names = [party[0] for party in user_parties]
-        return [
-            app_commands.Choice(name=party, value=party)
-            for party in party_names if current.lower() in party.lower()
-        ][:25]
+        parties = self.bot.db.parties.complete(interaction.user.id, current)
+        return [app_commands.Choice(name=party, value=party) for party in parties]
     
     @party_list.autocomplete('name')
     async def party_list_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        user_parties = await self.bot.db.get_user_parties(interaction.user.id)
-        party_names = [party[0] for party in user_parties]
-        return [
-            app_commands.Choice(name=party, value=party)
-            for party in party_names if current.lower() in party.lower()
-        ][:25]
+        parties = self.bot.db.parties.complete(interaction.user.id, current)
+        return [app_commands.Choice(name=party, value=party) for party in parties]
 
 async def setup(bot):
     await bot.add_cog(Parties(bot))
\ No newline at end of file
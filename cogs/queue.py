@@ -0,0 +1,869 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+import json
+import time
+from typing import List, Literal, Optional
+from utils.message_renderer import MessageRenderer
+from utils.matchmaker import Matchmaker
+from utils.permissions import check_admin_permissions
+from utils.rest_scheduler import CRITICAL, NORMAL, BACKGROUND
+
+READY_TIMEOUT = 240
+VOTE_TIMEOUT = 1800
+DM_CONCURRENCY = 5
+MATCHMAKING_INTERVAL = 5
+
+QUEUE_CONFIGS = {
+    "r6": {
+        "game": "r6",
+        "label": "R6",
+        "title": "R6",
+        "full_name": "Rainbow Six Siege",
+        "team_size": 5,
+        "votes_needed": 6,
+        "category_id": 1435065507685470289,
+        "channel_prefix": "r6"
+    },
+    "valorant": {
+        "game": "valorant",
+        "label": "Valorant",
+        "title": "Valorant",
+        "full_name": "Valorant",
+        "team_size": 5,
+        "votes_needed": 6,
+        "category_id": 1435934861214093393,
+        "channel_prefix": "valorant"
+    },
+    "breachers": {
+        "game": "breachers",
+        "label": "Breachers",
+        "title": "Breachers",
+        "full_name": "Breachers",
+        "team_size": 5,
+        "votes_needed": 6,
+        "category_id": 1435934718066692146,
+        "channel_prefix": "breachers"
+    },
+    "rl-3v3": {
+        "game": "rl",
+        "label": "Rocket League 3v3",
+        "title": "Rocket League 3V3",
+        "full_name": "Rocket League",
+        "team_size": 3,
+        "votes_needed": 4,
+        "category_id": 1435576716532908114,
+        "channel_prefix": "rl"
+    },
+    "rl-2v2": {
+        "game": "rl",
+        "label": "Rocket League 2v2",
+        "title": "Rocket League 2V2",
+        "full_name": "Rocket League",
+        "team_size": 2,
+        "votes_needed": 3,
+        "category_id": 1435576716532908114,
+        "channel_prefix": "rl"
+    },
+    "rl-1v1": {
+        "game": "rl",
+        "label": "Rocket League 1v1",
+        "title": "Rocket League 1V1",
+        "full_name": "Rocket League",
+        "team_size": 1,
+        "votes_needed": 2,
+        "category_id": 1435576716532908114,
+        "channel_prefix": "rl"
+    }
+}
+
+def queue_labels(queue_key):
+    config = QUEUE_CONFIGS[queue_key]
+    return {"game": config["game"], "mode": f"{config['team_size']}v{config['team_size']}"}
+
+async def timed_step(timings, name, awaitable):
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = time.perf_counter() - start
+
+class ReadyUpView(discord.ui.View):
+    phase = "ready"
+
+    def __init__(self, queue, queue_key, players, channel, queue_number, message, parties=()):
+        super().__init__(timeout=None)
+        self.queue = queue
+        self.bot = queue.bot
+        self.queue_key = queue_key
+        self.config = QUEUE_CONFIGS[queue_key]
+        self.players = players
+        self.parties = [list(party) for party in parties]
+        self.channel = channel
+        self.queue_number = queue_number
+        self.ready_players = set()
+        self.pool = queue.queues[queue_key]
+        self.message = message
+        self.max_players = len(players)
+        self.deadline = None
+        self.state = "waiting"
+        self.lock = asyncio.Lock()
+        self.renderer = MessageRenderer(lambda: {'embed': self.create_embed(), 'view': self}, self.bot.rest, metrics=self.bot.metrics)
+        self.renderer.message = message
+
+    def create_embed(self):
+        ready_list = '\n'.join([f"<@{player_id}> ✅" for player_id in self.players if player_id in self.ready_players])
+        unready_list = '\n'.join([f"<@{player_id}> ⏳" for player_id in self.players if player_id not in self.ready_players])
+
+        embed = discord.Embed(
+            title=f"{len(self.ready_players)}/{self.max_players} readied up",
+            description=f"**Ready:**\n{ready_list}\n\n**Not Ready:**\n{unready_list}" if ready_list and unready_list else (f"**Ready:**\n{ready_list}" if ready_list else f"**Not Ready:**\n{unready_list}"),
+            color=discord.Color.orange()
+        )
+        # Discord renders the relative timestamp and keeps it ticking client-side,
+        # so the message only has to be edited when someone readies up.
+        embed.add_field(name="Time remaining", value=f"<t:{self.deadline}:R>", inline=False)
+        return embed
+
+    def to_state(self):
+        return {
+            'players': self.players,
+            'ready_players': list(self.ready_players),
+            'deadline': self.deadline,
+            'parties': self.parties
+        }
+
+    @discord.ui.button(label="Ready Up", style=discord.ButtonStyle.green, custom_id="queue_ready_up")
+    async def ready_up(self, interaction: discord.Interaction, button: discord.ui.Button):
+        async with self.lock:
+            if self.state != "waiting":
+                await interaction.response.send_message("This ready check has already closed!", ephemeral=True)
+                return
+
+            if interaction.user.id not in self.players:
+                await interaction.response.send_message("You are not in this match!", ephemeral=True)
+                return
+
+            if interaction.user.id in self.ready_players:
+                await interaction.response.send_message("You are already readied up!", ephemeral=True)
+                return
+
+            self.ready_players.add(interaction.user.id)
+            complete = len(self.ready_players) == self.max_players
+            if complete:
+                self.state = "complete"
+                self.bot.metrics.inc("multiverse_ready_checks_total", outcome="complete", **queue_labels(self.queue_key))
+
+        await interaction.response.defer()
+        await self.queue.save_match(self)
+
+        if complete:
+            await self.queue.close_ready_check(self)
+            try:
+                await self.bot.rest.request(
+                    lambda: self.message.edit(embed=self.create_embed(), view=None),
+                    CRITICAL,
+                    key=("edit", self.message.id)
+                )
+            except:
+                pass
+            await self.start_match()
+        else:
+            self.renderer.invalidate()
+
+    async def expire(self):
+        game = self.config["game"]
+        unready_players = [player for player in self.players if player not in self.ready_players]
+
+        outcome = "substituted" if self.pool.solo_count() >= len(unready_players) else "cancelled"
+        self.bot.metrics.inc("multiverse_ready_checks_total", outcome=outcome, **queue_labels(self.queue_key))
+
+        if outcome == "substituted":
+            substitutes = self.pool.pop_front(len(unready_players))
+            await self.bot.db.remove_queue_members(self.queue_key, substitutes)
+
+            await self.bot.mmr_system.apply_ready_penalties(unready_players, game)
+
+            # Every swap goes out as one overwrite update instead of two
+            # set_permissions calls per substituted player.
+            overwrites = dict(self.channel.overwrites)
+            for player_id, substitute_id in zip(unready_players, substitutes):
+                self.players.remove(player_id)
+                self.players.append(substitute_id)
+
+                member = self.channel.guild.get_member(player_id)
+                if member:
+                    overwrites[member] = discord.PermissionOverwrite(read_messages=False)
+
+                sub_member = self.channel.guild.get_member(substitute_id)
+                if sub_member:
+                    overwrites[sub_member] = discord.PermissionOverwrite(read_messages=True)
+
+            await self.bot.rest.request(lambda: self.channel.edit(overwrites=overwrites), CRITICAL)
+
+            unready_mentions = ', '.join([f'<@{p}>' for p in unready_players])
+            sub_mentions = ', '.join([f'<@{p}>' for p in substitutes])
+
+            embed = discord.Embed(
+                title="Players Substituted",
+                description=f"**Removed (-{self.bot.mmr_system.ready_penalty} MMR):** {unready_mentions}\n**Added:** {sub_mentions}",
+                color=discord.Color.yellow()
+            )
+            await self.bot.rest.request(lambda: self.channel.send(embed=embed), NORMAL)
+
+            mentions = " ".join([f"<@{user_id}>" for user_id in substitutes])
+            await self.bot.rest.request(lambda: self.channel.send(mentions), NORMAL)
+
+            # A party that lost a member to a no-show no longer has to stay together.
+            parties = [party for party in self.parties if not set(party) & set(unready_players)]
+            await self.queue.open_ready_check(self.queue_key, self.players, self.channel, self.queue_number, parties)
+        else:
+            await self.bot.mmr_system.apply_ready_penalties(unready_players, game)
+
+            unready_mentions = ', '.join([f'<@{player}>' for player in unready_players])
+
+            try:
+                await self.bot.rest.request(lambda: self.message.edit(view=None), CRITICAL, key=("edit", self.message.id))
+            except:
+                pass
+
+            embed = discord.Embed(
+                title="Not All Players Ready",
+                description=f"Not all players readied up. Canceling queue in 10 seconds.\n\n**Players who didn't ready (-{self.bot.mmr_system.ready_penalty} MMR):**\n{unready_mentions}",
+                color=discord.Color.red()
+            )
+            await self.bot.rest.request(lambda: self.channel.send(embed=embed), NORMAL)
+
+            await self.queue.end_match(self.channel, 10)
+
+    async def start_match(self):
+        team1, team2 = await self.bot.mmr_system.balance_teams(self.players, self.config["game"], parties=self.parties)
+
+        embed = discord.Embed(
+            title=f"{self.config['title']} Match #{self.queue_number}",
+            color=discord.Color.gold()
+        )
+
+        team1_list = '\n'.join([f"<@{player}>" for player in team1])
+        team2_list = '\n'.join([f"<@{player}>" for player in team2])
+
+        embed.add_field(name="Team 1", value=team1_list, inline=True)
+        embed.add_field(name="Team 2", value=team2_list, inline=True)
+
+        await self.bot.rest.request(lambda: self.channel.send(embed=embed), NORMAL)
+
+        await self.queue.open_vote(self.queue_key, team1, team2, self.channel, self.queue_number)
+
+class WinnerVoteView(discord.ui.View):
+    phase = "vote"
+
+    def __init__(self, queue, queue_key, team1, team2, channel, queue_number):
+        super().__init__(timeout=None)
+        self.queue = queue
+        self.bot = queue.bot
+        self.queue_key = queue_key
+        self.config = QUEUE_CONFIGS[queue_key]
+        self.team1 = team1
+        self.team2 = team2
+        self.channel = channel
+        self.queue_number = queue_number
+        self.votes_needed = self.config["votes_needed"]
+        self.team1_votes = set()
+        self.team2_votes = set()
+        self.message = None
+        self.state = "voting"
+        self.started_at = time.time()
+        self.lock = asyncio.Lock()
+        self.renderer = MessageRenderer(lambda: {'embed': self.create_embed(), 'view': self}, self.bot.rest, metrics=self.bot.metrics)
+
+    def create_embed(self):
+        embed = discord.Embed(
+            title="Vote for Winner",
+            description=f"{self.votes_needed} votes needed to determine the winner",
+            color=discord.Color.red()
+        )
+        embed.add_field(name="Team 1 Votes", value=f"{len(self.team1_votes)}/{self.votes_needed}", inline=True)
+        embed.add_field(name="Team 2 Votes", value=f"{len(self.team2_votes)}/{self.votes_needed}", inline=True)
+        return embed
+
+    def to_state(self):
+        return {
+            'team1': self.team1,
+            'team2': self.team2,
+            'team1_votes': sorted(self.team1_votes),
+            'team2_votes': sorted(self.team2_votes),
+            'started_at': self.started_at
+        }
+
+    @discord.ui.button(label="Team 1 Wins", style=discord.ButtonStyle.green, custom_id="queue_team1_wins")
+    async def team1_wins(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.cast_vote(interaction, 1)
+
+    @discord.ui.button(label="Team 2 Wins", style=discord.ButtonStyle.green, custom_id="queue_team2_wins")
+    async def team2_wins(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.cast_vote(interaction, 2)
+
+    async def cast_vote(self, interaction, team):
+        # Clicks are checked and counted under the lock, so only the click that
+        # reaches the threshold moves the match to finalizing and applies MMR.
+        async with self.lock:
+            if self.state != "voting":
+                await interaction.response.send_message("Voting for this match has already closed!", ephemeral=True)
+                return
+
+            if interaction.user.id in self.team1_votes or interaction.user.id in self.team2_votes:
+                await interaction.response.send_message("You have already voted!", ephemeral=True)
+                return
+
+            votes = self.team1_votes if team == 1 else self.team2_votes
+            votes.add(interaction.user.id)
+            decided = len(votes) >= self.votes_needed
+            if decided:
+                self.state = "finalizing"
+
+        await interaction.response.send_message(f"Voted for Team {team}!", ephemeral=True)
+        await self.queue.save_match(self)
+
+        if decided:
+            await self.finish_match(team)
+        else:
+            self.renderer.invalidate()
+
+    async def finish_match(self, winning_team):
+        try:
+            mmr_changes = await self.bot.mmr_system.finalize_match(
+                self.team1, self.team2, winning_team, self.config["game"], self.queue_number
+            )
+        except:
+            # Nothing was written, so reopen the vote and let the next click retry.
+            async with self.lock:
+                self.state = "voting"
+            raise
+
+        self.state = "finished"
+        self.bot.metrics.observe(
+            "multiverse_match_duration_seconds", time.time() - self.started_at, **queue_labels(self.queue_key)
+        )
+        await self.queue.close_vote(self)
+
+        embed = discord.Embed(
+            title=f"{self.config['title']} Match #{self.queue_number} Results",
+            color=discord.Color.gold()
+        )
+
+        embed.add_field(
+            name="Winner",
+            value=f"Team {winning_team}",
+            inline=False
+        )
+
+        team1_mmr_text = []
+        for player in self.team1:
+            change = mmr_changes[player]
+            team1_mmr_text.append(f"<@{player}>: {'+' if change >= 0 else ''}{change}")
+
+        team2_mmr_text = []
+        for player in self.team2:
+            change = mmr_changes[player]
+            team2_mmr_text.append(f"<@{player}>: {'+' if change >= 0 else ''}{change}")
+
+        embed.add_field(
+            name="Team 1 MMR Changes",
+            value='\n'.join(team1_mmr_text),
+            inline=True
+        )
+
+        embed.add_field(
+            name="Team 2 MMR Changes",
+            value='\n'.join(team2_mmr_text),
+            inline=True
+        )
+
+        await self.bot.rest.request(lambda: self.channel.send(embed=embed), NORMAL)
+
+        await self.queue.end_match(self.channel, 2)
+
+class Queue(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.queues = {
+            queue_key: Matchmaker(self.rating_lookup(config["game"]), on_pop=self.pop_recorder(queue_key))
+            for queue_key, config in QUEUE_CONFIGS.items()
+        }
+        self.ready_views = {}
+        self.vote_views = {}
+        self.restored = asyncio.Event()
+        self.restore_task = None
+        self.matchmaking_task = None
+
+    def rating_lookup(self, game):
+        def rating(user_id):
+            return self.bot.db.cache.game_ratings(game).get(user_id, 500)
+        return rating
+
+    def pop_recorder(self, queue_key):
+        def record(waits):
+            for waited in waits:
+                self.bot.metrics.observe("multiverse_time_to_pop_seconds", waited, **queue_labels(queue_key))
+        return record
+
+    def collect_metrics(self, metrics):
+        for queue_key, pool in self.queues.items():
+            metrics.set("multiverse_queue_depth", len(pool), **queue_labels(queue_key))
+
+    async def cog_load(self):
+        self.bot.metrics.add_collector(self.collect_metrics)
+        self.bot.scheduler.register("ready_timeout", self.handle_ready_timeout)
+        self.bot.scheduler.register("vote_timeout", self.handle_vote_timeout)
+        self.bot.scheduler.register("delete_channel", self.handle_channel_delete)
+
+        for config in QUEUE_CONFIGS.values():
+            self.bot.channel_pool.register(config["category_id"])
+
+        groups = {}
+        for queue_key, user_id, joined_at, group_id in await self.bot.db.get_queue_members():
+            if queue_key not in self.queues:
+                continue
+            if group_id is None:
+                self.queues[queue_key].append(user_id, joined_at)
+            elif (queue_key, group_id) not in groups:
+                groups[(queue_key, group_id)] = ([user_id], joined_at)
+            else:
+                groups[(queue_key, group_id)][0].append(user_id)
+
+        for (queue_key, group_id), (user_ids, joined_at) in groups.items():
+            self.queues[queue_key].append_group(user_ids, joined_at)
+
+        self.restore_task = asyncio.create_task(self.restore_matches())
+        self.matchmaking_task = asyncio.create_task(self.run_matchmaking())
+
+    async def cog_unload(self):
+        self.bot.metrics.remove_collector(self.collect_metrics)
+        if self.restore_task is not None:
+            self.restore_task.cancel()
+        if self.matchmaking_task is not None:
+            self.matchmaking_task.cancel()
+
+    async def run_matchmaking(self):
+        # Search windows widen while players wait, so a queue that could not form
+        # a match when the last player joined may be able to now.
+        await self.bot.wait_until_ready()
+        await self.restored.wait()
+
+        while True:
+            await asyncio.sleep(MATCHMAKING_INTERVAL)
+            for queue_key, config in QUEUE_CONFIGS.items():
+                category = self.bot.get_channel(config["category_id"])
+                if category is None:
+                    continue
+
+                match = self.queues[queue_key].find_match(config["team_size"] * 2)
+                if match:
+                    try:
+                        await self.start_match(category.guild, queue_key, *match)
+                    except Exception as e:
+                        print(f"Failed to start {queue_key} match: {e}")
+
+    async def restore_matches(self):
+        # Channels are only resolvable once the gateway is ready. Button clicks
+        # cannot arrive before then either, so re-adding the views here is early enough.
+        await self.bot.wait_until_ready()
+        ready_to_start = []
+
+        for channel_id, queue_key, queue_number, phase, message_id, state in await self.bot.db.get_active_matches():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None or queue_key not in QUEUE_CONFIGS:
+                await self.bot.db.delete_active_match(channel_id)
+                continue
+
+            state = json.loads(state)
+            if phase == "ready":
+                view = ReadyUpView(self, queue_key, state['players'], channel, queue_number, None, state.get('parties', []))
+                view.ready_players = set(state['ready_players'])
+                view.deadline = state['deadline']
+                self.ready_views[channel_id] = view
+                # Everyone readied before a restart cut the match off between
+                # the last click and the vote being saved.
+                if set(view.players) <= view.ready_players:
+                    view.state = "complete"
+                    ready_to_start.append(view)
+            else:
+                view = WinnerVoteView(self, queue_key, state['team1'], state['team2'], channel, queue_number)
+                view.team1_votes = set(state['team1_votes'])
+                view.team2_votes = set(state['team2_votes'])
+                view.started_at = state.get('started_at', view.started_at)
+                self.vote_views[channel_id] = view
+
+            if message_id is not None:
+                view.message = channel.get_partial_message(message_id)
+                self.bot.add_view(view, message_id=message_id)
+                view.renderer.message = view.message
+
+        self.restored.set()
+
+        for view in ready_to_start:
+            await self.close_ready_check(view)
+            try:
+                await view.start_match()
+            except Exception as e:
+                print(f"Failed to start restored match in {view.channel.name}: {e}")
+
+    async def save_match(self, view):
+        # A click that raced the deadline must not write back a view that has
+        # already been closed and cleared.
+        if view.state == "expired":
+            return
+
+        await self.bot.db.save_active_match(
+            view.channel.id,
+            view.queue_key,
+            view.queue_number,
+            view.phase,
+            view.message.id if view.message else None,
+            json.dumps(view.to_state())
+        )
+
+    async def end_match(self, channel, delete_after):
+        await self.bot.db.delete_active_match(channel.id)
+        await self.schedule_channel_delete(channel, delete_after)
+
+    async def open_ready_check(self, queue_key, players, channel, queue_number, parties=()):
+        ready_view = ReadyUpView(self, queue_key, players, channel, queue_number, None, parties)
+        due_at = await self.bot.scheduler.schedule(
+            f"ready:{channel.id}", "ready_timeout", READY_TIMEOUT, {"channel_id": channel.id}
+        )
+        ready_view.deadline = int(due_at)
+        self.ready_views[channel.id] = ready_view
+
+        message = await self.bot.rest.request(
+            lambda: channel.send(embed=ready_view.create_embed(), view=ready_view), CRITICAL
+        )
+        ready_view.message = message
+        ready_view.renderer.message = message
+        await self.save_match(ready_view)
+        return ready_view
+
+    async def close_ready_check(self, ready_view):
+        ready_view.stop()
+        ready_view.renderer.close()
+        self.ready_views.pop(ready_view.channel.id, None)
+        await self.bot.scheduler.cancel(f"ready:{ready_view.channel.id}")
+
+    async def open_vote(self, queue_key, team1, team2, channel, queue_number):
+        vote_view = WinnerVoteView(self, queue_key, team1, team2, channel, queue_number)
+        self.vote_views[channel.id] = vote_view
+        await self.bot.scheduler.schedule(
+            f"vote:{channel.id}", "vote_timeout", VOTE_TIMEOUT, {"channel_id": channel.id}
+        )
+
+        vote_message = await self.bot.rest.request(
+            lambda: channel.send(embed=vote_view.create_embed(), view=vote_view), CRITICAL
+        )
+        vote_view.message = vote_message
+        vote_view.renderer.message = vote_message
+        await self.save_match(vote_view)
+        return vote_view
+
+    async def close_vote(self, vote_view):
+        vote_view.stop()
+        vote_view.renderer.close()
+        self.vote_views.pop(vote_view.channel.id, None)
+        await self.bot.scheduler.cancel(f"vote:{vote_view.channel.id}")
+
+    async def schedule_channel_delete(self, channel, delay):
+        await self.bot.scheduler.schedule(
+            f"delete:{channel.id}", "delete_channel", delay, {"channel_id": channel.id}
+        )
+
+    async def handle_ready_timeout(self, payload):
+        await self.restored.wait()
+        ready_view = self.ready_views.get(payload["channel_id"])
+        if ready_view is None:
+            return
+
+        async with ready_view.lock:
+            if ready_view.state != "waiting":
+                return
+            ready_view.state = "expired"
+
+        await self.close_ready_check(ready_view)
+        await ready_view.expire()
+
+    async def handle_vote_timeout(self, payload):
+        await self.restored.wait()
+        vote_view = self.vote_views.get(payload["channel_id"])
+        if vote_view is None:
+            return
+
+        async with vote_view.lock:
+            if vote_view.state != "voting":
+                return
+            vote_view.state = "expired"
+
+        await self.close_vote(vote_view)
+        # Nothing else ends an expired vote, so drop its saved state here or a
+        # restart would bring the buttons back with no deadline behind them.
+        await self.bot.db.delete_active_match(vote_view.channel.id)
+
+    async def handle_channel_delete(self, payload):
+        # Deadlines restored at startup can fire before the gateway has filled
+        # the channel cache.
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(payload["channel_id"])
+        if channel is not None and not await self.bot.channel_pool.release(channel):
+            await self.bot.rest.request(channel.delete, BACKGROUND)
+
+    @app_commands.command(name="r6-queue", description="Join the Rainbow Six Siege 5v5 queue")
+    async def r6_queue(self, interaction: discord.Interaction):
+        await self.join_queue(interaction, "r6")
+
+    @app_commands.command(name="valorant-queue", description="Join the Valorant 5v5 queue")
+    async def valorant_queue(self, interaction: discord.Interaction):
+        await self.join_queue(interaction, "valorant")
+
+    @app_commands.command(name="breachers-queue", description="Join the Breachers 5v5 queue")
+    async def breachers_queue(self, interaction: discord.Interaction):
+        await self.join_queue(interaction, "breachers")
+
+    @app_commands.command(name="rocketleague-queue", description="Join a Rocket League queue")
+    @app_commands.describe(type="Choose the game mode")
+    async def rl_queue(self, interaction: discord.Interaction, type: Literal["3v3", "2v2", "1v1"]):
+        await self.join_queue(interaction, f"rl-{type}")
+
+    @app_commands.command(name="queue-leave", description="Leave a queue you are waiting in")
+    @app_commands.describe(queue="Queue to leave (leave blank to leave every queue)")
+    async def queue_leave(
+        self,
+        interaction: discord.Interaction,
+        queue: Optional[Literal["r6", "valorant", "breachers", "rl-3v3", "rl-2v2", "rl-1v1"]] = None
+    ):
+        queue_keys = [queue] if queue else list(QUEUE_CONFIGS)
+        left = []
+
+        # Leaving takes the whole party out, since it can only be matched together.
+        for queue_key in queue_keys:
+            group = self.queues[queue_key].group_of(interaction.user.id)
+            if group is not None:
+                self.queues[queue_key].remove(interaction.user.id)
+                await self.bot.db.remove_queue_members(queue_key, list(group))
+                left.append(queue_key)
+
+        if not left:
+            if queue:
+                await interaction.response.send_message(f"You are not in the {QUEUE_CONFIGS[queue]['label']} queue!", ephemeral=True)
+            else:
+                await interaction.response.send_message("You are not in any queue!", ephemeral=True)
+            return
+
+        labels = ', '.join(QUEUE_CONFIGS[queue_key]['label'] for queue_key in left)
+        await interaction.response.send_message(
+            f"You have left the {labels} queue{'s' if len(left) > 1 else ''}!",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="queue-status", description="See your position in the queues you joined")
+    async def queue_status(self, interaction: discord.Interaction):
+        embed = discord.Embed(
+            title="Your Queues",
+            color=discord.Color.blue()
+        )
+
+        for queue_key, config in QUEUE_CONFIGS.items():
+            position = self.queues[queue_key].position(interaction.user.id)
+            if position is not None:
+                embed.add_field(
+                    name=config['label'],
+                    value=f"Position {position} of {len(self.queues[queue_key])} ({config['team_size'] * 2} needed)",
+                    inline=False
+                )
+
+        if not embed.fields:
+            await interaction.response.send_message("You are not in any queue!", ephemeral=True)
+            return
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="matchmaking-stats", description="ADMIN: View match quality against wait time")
+    async def matchmaking_stats(self, interaction: discord.Interaction):
+        if not check_admin_permissions(interaction):
+            await interaction.response.send_message(
+                "You do not have the permissions to do this command.",
+                ephemeral=True
+            )
+            return
+
+        embed = discord.Embed(
+            title="Matchmaking Stats",
+            description="MMR spread of formed matches, grouped by the longest wait in the match",
+            color=discord.Color.blue()
+        )
+
+        for queue_key, config in QUEUE_CONFIGS.items():
+            lines = [
+                f"**{band}:** {stats['matches']} matches, {stats['avg_spread']} avg spread, {stats['avg_longest_wait']}s avg wait"
+                for band, stats in self.queues[queue_key].stats().items()
+                if stats['matches']
+            ]
+            embed.add_field(
+                name=f"{config['label']} ({len(self.queues[queue_key])} waiting)",
+                value='\n'.join(lines) if lines else "No matches yet",
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="queue", description="Join a queue, optionally together with your party")
+    @app_commands.describe(
+        queue="Queue to join",
+        party="Party to queue with (leave blank to queue alone)"
+    )
+    async def queue(
+        self,
+        interaction: discord.Interaction,
+        queue: Literal["r6", "valorant", "breachers", "rl-3v3", "rl-2v2", "rl-1v1"],
+        party: Optional[str] = None
+    ):
+        await self.join_queue(interaction, queue, party)
+
+    @queue.autocomplete('party')
+    async def queue_party_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        parties = self.bot.db.parties.complete(interaction.user.id, current)
+        return [app_commands.Choice(name=party, value=party) for party in parties]
+
+    async def join_queue(self, interaction, queue_key, party=None):
+        config = QUEUE_CONFIGS[queue_key]
+        pool = self.queues[queue_key]
+        match_size = config["team_size"] * 2
+
+        # Party membership comes from the in-memory index, so joining never
+        # waits on a database read.
+        user_ids = [interaction.user.id]
+        if party is not None:
+            captains = [captain_id for name, captain_id in self.bot.db.parties.user_parties(interaction.user.id) if name == party]
+            if not captains:
+                await interaction.response.send_message("You are not in a party with that name!", ephemeral=True)
+                return
+
+            user_ids = self.bot.db.parties.members(party, captains[0])
+            if len(user_ids) < 2:
+                await interaction.response.send_message("Your party has no other members yet!", ephemeral=True)
+                return
+
+            if len(user_ids) > config["team_size"]:
+                await interaction.response.send_message(
+                    f"Your party is too big for the {config['label']} queue! ({config['team_size']} per team)",
+                    ephemeral=True
+                )
+                return
+
+        queued = [user_id for user_id in user_ids if user_id in pool]
+        if queued:
+            if queued == [interaction.user.id]:
+                await interaction.response.send_message(f"You are already in the {config['label']} queue!", ephemeral=True)
+            else:
+                mentions = ', '.join(f"<@{user_id}>" for user_id in queued)
+                await interaction.response.send_message(f"{mentions} already in the {config['label']} queue!", ephemeral=True)
+            return
+
+        pool.append_group(user_ids)
+        await self.bot.db.add_queue_members(queue_key, user_ids)
+
+        if len(user_ids) > 1:
+            mentions = ', '.join(f"<@{user_id}>" for user_id in user_ids)
+            message = f"Your party ({mentions}) has joined the {config['label']} queue! ({len(pool)}/{match_size})"
+        else:
+            message = f"You have joined the {config['label']} queue! ({len(pool)}/{match_size})"
+        await interaction.response.send_message(message, ephemeral=True)
+
+        match = pool.find_match(match_size, anchors=[interaction.user.id])
+        if match:
+            await self.start_match(interaction.guild, queue_key, *match)
+
+    async def start_match(self, guild, queue_key, players, parties=()):
+        config = QUEUE_CONFIGS[queue_key]
+        started_at = time.perf_counter()
+        timings = {}
+
+        await self.bot.db.remove_queue_members(queue_key, players)
+
+        category = guild.get_channel(config["category_id"])
+
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(read_messages=False),
+        }
+
+        members = []
+        for user_id in players:
+            user = guild.get_member(user_id)
+            if user:
+                overwrites[user] = discord.PermissionOverwrite(read_messages=True)
+                members.append(user)
+
+        prefix = config["channel_prefix"]
+        queue_number = self.bot.match_counters[prefix]
+        self.bot.match_counters[prefix] += 1
+
+        # The channel, the DMs and the first channel messages only depend on each
+        # other through the channel itself, so they run side by side instead of
+        # one REST round-trip after another.
+        channel_task = asyncio.create_task(timed_step(timings, "channel", self.open_match_channel(
+            guild,
+            category,
+            f"{prefix}-{queue_number:04d}",
+            overwrites
+        )))
+        dm_task = asyncio.create_task(timed_step(timings, "dms", self.send_match_dms(members, config, channel_task)))
+
+        try:
+            await self.bot.db.set_match_counter(prefix, self.bot.match_counters[prefix])
+            match_channel = await channel_task
+        except:
+            dm_task.cancel()
+            raise
+
+        mentions = " ".join([f"<@{user_id}>" for user_id in players])
+        await timed_step(timings, "mentions", self.bot.rest.request(lambda: match_channel.send(f"{mentions}"), NORMAL))
+
+        await timed_step(timings, "ready_check", self.open_ready_check(queue_key, players.copy(), match_channel, queue_number, parties))
+
+        sent = await dm_task
+        steps = ", ".join(f"{name} {elapsed * 1000:.0f}ms" for name, elapsed in timings.items())
+        print(
+            f"Started {match_channel.name} in {(time.perf_counter() - started_at) * 1000:.0f}ms "
+            f"({steps}; {sent}/{len(members)} DMs delivered)"
+        )
+
+    async def open_match_channel(self, guild, category, name, overwrites):
+        channel = await self.bot.channel_pool.checkout(category, name, overwrites)
+        if channel is None:
+            channel = await self.bot.rest.request(
+                lambda: guild.create_text_channel(name, category=category, overwrites=overwrites), CRITICAL
+            )
+        return channel
+
+    async def send_match_dms(self, members, config, channel_task):
+        semaphore = asyncio.Semaphore(DM_CONCURRENCY)
+
+        async def send_dm(member):
+            try:
+                async with semaphore:
+                    dm_channel = member.dm_channel or await self.bot.rest.request(member.create_dm, NORMAL)
+
+                match_channel = await channel_task
+                dm_embed = discord.Embed(
+                    title=f"{config['title']} Match Ready!",
+                    description=f"Your {config['full_name']} match is ready in {match_channel.mention}",
+                    color=discord.Color.green()
+                )
+                async with semaphore:
+                    await self.bot.rest.request(lambda: dm_channel.send(embed=dm_embed), NORMAL)
+                return True
+            except Exception:
+                return False
+
+        results = await asyncio.gather(*(send_dm(member) for member in members))
+        return sum(results)
+
+async def setup(bot):
+    await bot.add_cog(Queue(bot))
\ No newline at end of file
@@ -1,34 +1,96 @@
+import ast
 import sqlite3
 import aiosqlite
+import asyncio
+import functools
+import time
 from datetime import datetime
+from database.rating_cache import RatingCache
+from database.party_index import PartyIndex
+
+DURABILITY_PROFILES = {
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "busy_timeout": 5000,
+        "journal_fsync": False
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16384,
+        "mmap_size": 134217728,
+        "busy_timeout": 5000,
+        "journal_fsync": True
+    },
+    "paranoid": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "busy_timeout": 10000,
+        "journal_fsync": True
+    }
+}
+
+# Column prefixes of the old wide players table, only needed to migrate it.
+LEGACY_GAMES = ("r6", "rl", "valorant", "breachers")
+
+def timed(func):
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self.record_latency(func.__name__, time.perf_counter() - start)
+    return wrapper
 
 class DatabaseManager:
-    def __init__(self, db_path="multiverse.db"):
+    def __init__(self, db_path="multiverse.db", flush_interval=5, profile="balanced", metrics=None):
+        if profile not in DURABILITY_PROFILES:
+            raise ValueError(f"Unknown durability profile: {profile}")
+        
         self.db_path = db_path
+        self.profile = profile
+        self.conn = None
+        self.cache = RatingCache(f"{db_path}-ratings.log", fsync=DURABILITY_PROFILES[profile]["journal_fsync"])
+        self.parties = PartyIndex()
+        self.flush_interval = flush_interval
+        self.flush_task = None
+        # Every coroutine shares one connection, so statements and their commit
+        # have to run under this lock or they could commit each other's writes.
+        self.lock = asyncio.Lock()
+        self.metrics = metrics
+    
+    def record_latency(self, name, elapsed):
+        if self.metrics is not None:
+            self.metrics.observe("multiverse_db_call_seconds", elapsed, method=name)
     
     async def initialize(self):
-        async with aiosqlite.connect(self.db_path) as db:
+        if self.conn is None:
+            self.conn = await self.connect()
+        
+        db = self.conn
+        async with self.lock:
             await db.execute('''
-                CREATE TABLE IF NOT EXISTS players (
-                    user_id INTEGER PRIMARY KEY,
-                    r6_mmr INTEGER DEFAULT 500,
-                    r6_games INTEGER DEFAULT 0,
-                    r6_wins INTEGER DEFAULT 0,
-                    r6_losses INTEGER DEFAULT 0,
-                    rl_mmr INTEGER DEFAULT 500,
-                    rl_games INTEGER DEFAULT 0,
-                    rl_wins INTEGER DEFAULT 0,
-                    rl_losses INTEGER DEFAULT 0,
-                    valorant_mmr INTEGER DEFAULT 500,
-                    valorant_games INTEGER DEFAULT 0,
-                    valorant_wins INTEGER DEFAULT 0,
-                    valorant_losses INTEGER DEFAULT 0,
-                    breachers_mmr INTEGER DEFAULT 500,
-                    breachers_games INTEGER DEFAULT 0,
-                    breachers_wins INTEGER DEFAULT 0,
-                    breachers_losses INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
+                CREATE TABLE IF NOT EXISTS player_ratings (
+                    user_id INTEGER NOT NULL,
+                    game TEXT NOT NULL,
+                    mmr INTEGER NOT NULL DEFAULT 500,
+                    games INTEGER NOT NULL DEFAULT 0,
+                    wins INTEGER NOT NULL DEFAULT 0,
+                    losses INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, game)
+                ) WITHOUT ROWID
+            ''')
+            
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_player_ratings_game_mmr
+                ON player_ratings (game, mmr DESC)
             ''')
             
             await db.execute('''
@@ -40,10 +102,36 @@ class DatabaseManager:
                     team2_players TEXT,
                     winner INTEGER,
                     mmr_changes TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    history_seq INTEGER
                 )
             ''')
             
+            cursor = await db.execute('PRAGMA table_info(matches)')
+            if 'history_seq' not in [row[1] for row in await cursor.fetchall()]:
+                await db.execute('ALTER TABLE matches ADD COLUMN history_seq INTEGER')
+            
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_matches_game_created
+                ON matches (game_type, created_at)
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS match_participants (
+                    match_id INTEGER NOT NULL REFERENCES matches (match_id) ON DELETE CASCADE,
+                    user_id INTEGER NOT NULL,
+                    team INTEGER NOT NULL,
+                    mmr_before INTEGER,
+                    mmr_delta INTEGER,
+                    PRIMARY KEY (match_id, user_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_match_participants_user
+                ON match_participants (user_id, match_id DESC)
+            ''')
+            
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS mmr_history (
                     history_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -56,261 +144,798 @@ class DatabaseManager:
                 )
             ''')
             
+            legacy_parties = await self.detach_legacy_parties(db)
+            
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS parties (
                     party_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    party_name TEXT,
-                    captain_id INTEGER,
-                    member_id INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    name TEXT NOT NULL,
+                    captain_id INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (captain_id, name)
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS party_members (
+                    party_id INTEGER NOT NULL REFERENCES parties (party_id) ON DELETE CASCADE,
+                    member_id INTEGER NOT NULL,
+                    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (party_id, member_id)
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_party_members_member
+                ON party_members (member_id)
+            ''')
+            
+            if legacy_parties:
+                await self.migrate_parties(db)
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS bot_state (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS scheduled_deadlines (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    due_at REAL NOT NULL,
+                    payload TEXT
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS queue_members (
+                    queue_key TEXT NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    group_id INTEGER,
+                    PRIMARY KEY (queue_key, user_id)
+                )
+            ''')
+            
+            cursor = await db.execute('PRAGMA table_info(queue_members)')
+            if 'group_id' not in [row[1] for row in await cursor.fetchall()]:
+                await db.execute('ALTER TABLE queue_members ADD COLUMN group_id INTEGER')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS active_matches (
+                    channel_id INTEGER PRIMARY KEY,
+                    queue_key TEXT NOT NULL,
+                    queue_number INTEGER NOT NULL,
+                    phase TEXT NOT NULL,
+                    message_id INTEGER,
+                    state TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS pooled_channels (
+                    channel_id INTEGER PRIMARY KEY,
+                    category_id INTEGER NOT NULL
                 )
             ''')
             
+            await self.migrate_wide_players(db)
+            await self.migrate_match_text(db)
+            
             await db.commit()
+            
+            await self.replay_rating_journal(db)
+            
+            cursor = await db.execute('SELECT user_id, game, mmr FROM player_ratings')
+            self.cache.load(await cursor.fetchall())
+            
+            cursor = await db.execute('''
+                SELECT p.name, p.captain_id, m.member_id
+                FROM party_members m JOIN parties p ON p.party_id = m.party_id
+                ORDER BY m.rowid
+            ''')
+            self.parties.load(await cursor.fetchall())
+        
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_periodically())
     
-    async def get_player_mmr(self, user_id, game_type):
-        async with aiosqlite.connect(self.db_path) as db:
-            if game_type == "r6":
-                cursor = await db.execute('SELECT r6_mmr FROM players WHERE user_id = ?', (user_id,))
-            elif game_type == "rl":
-                cursor = await db.execute('SELECT rl_mmr FROM players WHERE user_id = ?', (user_id,))
-            elif game_type == "valorant":
-                cursor = await db.execute('SELECT valorant_mmr FROM players WHERE user_id = ?', (user_id,))
-            elif game_type == "breachers":
-                cursor = await db.execute('SELECT breachers_mmr FROM players WHERE user_id = ?', (user_id,))
+    async def connect(self):
+        conn = await aiosqlite.connect(self.db_path)
+        
+        settings = DURABILITY_PROFILES[self.profile]
+        await conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+        await conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+        await conn.execute(f"PRAGMA cache_size = {settings['cache_size']}")
+        await conn.execute(f"PRAGMA mmap_size = {settings['mmap_size']}")
+        await conn.execute(f"PRAGMA busy_timeout = {settings['busy_timeout']}")
+        await conn.execute("PRAGMA foreign_keys = ON")
+        
+        return conn
+    
+    async def migrate_wide_players(self, db):
+        # Databases created before player_ratings kept one r6_/rl_/valorant_/breachers_
+        # column set per game on a single players row. Copy those rows over once and
+        # move the old table aside so this never runs again.
+        cursor = await db.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'players'")
+        if await cursor.fetchone() is None:
+            return
+        
+        for game in LEGACY_GAMES:
+            await db.execute(f'''
+                INSERT OR IGNORE INTO player_ratings (user_id, game, mmr, games, wins, losses, created_at)
+                SELECT user_id, ?, {game}_mmr, {game}_games, {game}_wins, {game}_losses, created_at
+                FROM players
+            ''', (game,))
+        
+        await db.execute('ALTER TABLE players RENAME TO players_legacy')
+    
+    async def detach_legacy_parties(self, db):
+        # parties used to hold one row per membership with the party name and
+        # captain repeated on each. Move that table aside so the normalized one
+        # can take its name, and copy it over once both new tables exist.
+        cursor = await db.execute('PRAGMA table_info(parties)')
+        if 'member_id' not in [row[1] for row in await cursor.fetchall()]:
+            return False
+        
+        await db.execute('ALTER TABLE parties RENAME TO parties_legacy')
+        return True
+    
+    async def migrate_parties(self, db):
+        await db.execute('''
+            INSERT OR IGNORE INTO parties (name, captain_id, created_at)
+            SELECT party_name, captain_id, MIN(created_at) FROM parties_legacy
+            WHERE party_name IS NOT NULL AND captain_id IS NOT NULL
+            GROUP BY captain_id, party_name
+            ORDER BY MIN(party_id)
+        ''')
+        
+        cursor = await db.execute('''
+            INSERT OR IGNORE INTO party_members (party_id, member_id, joined_at)
+            SELECT p.party_id, l.member_id, l.created_at
+            FROM parties_legacy l JOIN parties p ON p.captain_id = l.captain_id AND p.name = l.party_name
+            WHERE l.member_id IS NOT NULL
+            ORDER BY l.member_id != l.captain_id, l.party_id
+        ''')
+        print(f"Migrated {cursor.rowcount} party memberships to party_members")
+    
+    async def migrate_match_text(self, db):
+        # Matches used to keep both rosters and the rating changes as str() reprs on
+        # the matches row. Parse any that are left into match_participants and clear
+        # the text so each row is only converted once.
+        cursor = await db.execute('''
+            SELECT match_id, team1_players, team2_players, mmr_changes FROM matches
+            WHERE team1_players IS NOT NULL OR team2_players IS NOT NULL
+        ''')
+        rows = await cursor.fetchall()
+        if not rows:
+            return
+        
+        participants = []
+        migrated = 0
+        for match_id, team1, team2, mmr_changes in rows:
+            try:
+                team1 = ast.literal_eval(team1) if team1 else []
+                team2 = ast.literal_eval(team2) if team2 else []
+                mmr_changes = ast.literal_eval(mmr_changes) if mmr_changes else {}
+            except (ValueError, SyntaxError):
+                print(f"Skipping unreadable match {match_id} during migration")
+                continue
             
-            result = await cursor.fetchone()
-            if result:
-                return result[0]
-            else:
-                await db.execute('INSERT INTO players (user_id) VALUES (?)', (user_id,))
+            for team, players in ((1, team1), (2, team2)):
+                for user_id in players:
+                    participants.append((match_id, user_id, team, None, mmr_changes.get(user_id)))
+            
+            await db.execute(
+                'UPDATE matches SET team1_players = NULL, team2_players = NULL, mmr_changes = NULL WHERE match_id = ?',
+                (match_id,)
+            )
+            migrated += 1
+        
+        await db.executemany('''
+            INSERT OR IGNORE INTO match_participants (match_id, user_id, team, mmr_before, mmr_delta)
+            VALUES (?, ?, ?, ?, ?)
+        ''', participants)
+        print(f"Migrated {migrated} matches to match_participants")
+    
+    async def insert_match(self, db, game_type, queue_number, team1, team2, winner, mmr_changes, old_mmrs=None):
+        cursor = await db.execute('''
+            INSERT INTO matches (game_type, queue_number, winner, created_at, history_seq)
+            VALUES (?, ?, ?, strftime('%Y-%m-%d %H:%M:%f', 'now'), (SELECT MAX(history_id) FROM mmr_history))
+        ''', (game_type, queue_number, winner))
+        match_id = cursor.lastrowid
+        
+        old_mmrs = old_mmrs or {}
+        await db.executemany('''
+            INSERT INTO match_participants (match_id, user_id, team, mmr_before, mmr_delta)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (match_id, user_id, team, old_mmrs.get(user_id), mmr_changes.get(user_id))
+            for team, players in ((1, team1), (2, team2))
+            for user_id in players
+        ])
+        return match_id
+    
+    async def replay_rating_journal(self, db):
+        cursor = await db.execute("SELECT value FROM bot_state WHERE key = 'rating_journal_seq'")
+        result = await cursor.fetchone()
+        last_seq = result[0] if result else 0
+        
+        entries = self.cache.read_journal(last_seq)
+        if entries:
+            await self.write_rating_entries(db, entries)
+            await db.commit()
+            last_seq = entries[-1]['seq']
+        
+        self.cache.open_journal(last_seq)
+        self.cache.mark_flushed([])
+    
+    async def write_rating_entries(self, db, entries):
+        await db.executemany('''
+            INSERT INTO player_ratings (user_id, game, mmr) VALUES (?, ?, ?)
+            ON CONFLICT (user_id, game) DO UPDATE SET mmr = excluded.mmr
+        ''', [(entry['user_id'], entry['game'], entry['new_mmr']) for entry in entries])
+        await db.executemany('''
+            INSERT INTO mmr_history (user_id, game_type, old_mmr, new_mmr, change_reason, changed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [
+            (entry['user_id'], entry['game'], entry['old_mmr'], entry['new_mmr'], entry['reason'], entry['at'])
+            for entry in entries
+        ])
+        await db.execute('''
+            INSERT INTO bot_state (key, value) VALUES ('rating_journal_seq', ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        ''', (entries[-1]['seq'],))
+    
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Failed to flush rating journal: {e}")
+    
+    @timed
+    async def flush(self):
+        db = self.conn
+        async with self.lock:
+            entries = self.cache.take_pending()
+            if not entries:
+                return
+            
+            try:
+                await self.write_rating_entries(db, entries)
                 await db.commit()
-                return 500
+            except Exception:
+                await db.rollback()
+                raise
+            
+            self.cache.mark_flushed(entries)
     
+    async def close(self):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        
+        if self.conn is not None:
+            await self.flush()
+            self.cache.close_journal()
+            await self.conn.close()
+            self.conn = None
+    
+    @timed
+    async def get_player_mmr(self, user_id, game_type):
+        mmr = self.cache.get(user_id, game_type)
+        return 500 if mmr is None else mmr
+    
+    @timed
     async def update_player_mmr(self, user_id, game_type, new_mmr, reason="Game result"):
         new_mmr = max(0, new_mmr)
-        old_mmr = await self.get_player_mmr(user_id, game_type)
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            if game_type == "r6":
-                await db.execute('UPDATE players SET r6_mmr = ? WHERE user_id = ?', (new_mmr, user_id))
-            elif game_type == "rl":
-                await db.execute('UPDATE players SET rl_mmr = ? WHERE user_id = ?', (new_mmr, user_id))
-            elif game_type == "valorant":
-                await db.execute('UPDATE players SET valorant_mmr = ? WHERE user_id = ?', (new_mmr, user_id))
-            elif game_type == "breachers":
-                await db.execute('UPDATE players SET breachers_mmr = ? WHERE user_id = ?', (new_mmr, user_id))
-            
-            await db.execute('''
-                INSERT INTO mmr_history (user_id, game_type, old_mmr, new_mmr, change_reason)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, game_type, old_mmr, new_mmr, reason))
-            await db.commit()
+        # Held so a match or penalty being written cannot read this player's
+        # rating before the change and then overwrite it.
+        async with self.lock:
+            old_mmr = await self.get_player_mmr(user_id, game_type)
+            await self.cache.record(user_id, game_type, old_mmr, new_mmr, reason)
     
+    @timed
     async def update_player_stats(self, user_id, game_type, won):
-        async with aiosqlite.connect(self.db_path) as db:
-            if game_type == "r6":
-                if won:
-                    await db.execute('''
-                        UPDATE players SET r6_games = r6_games + 1, r6_wins = r6_wins + 1
-                        WHERE user_id = ?
-                    ''', (user_id,))
-                else:
-                    await db.execute('''
-                        UPDATE players SET r6_games = r6_games + 1, r6_losses = r6_losses + 1
-                        WHERE user_id = ?
-                    ''', (user_id,))
-            elif game_type == "rl":
-                if won:
-                    await db.execute('''
-                        UPDATE players SET rl_games = rl_games + 1, rl_wins = rl_wins + 1
-                        WHERE user_id = ?
-                    ''', (user_id,))
-                else:
-                    await db.execute('''
-                        UPDATE players SET rl_games = rl_games + 1, rl_losses = rl_losses + 1
-                        WHERE user_id = ?
-                    ''', (user_id,))
-            elif game_type == "valorant":
-                if won:
-                    await db.execute('''
-                        UPDATE players SET valorant_games = valorant_games + 1, valorant_wins = valorant_wins + 1
-                        WHERE user_id = ?
-                    ''', (user_id,))
-                else:
-                    await db.execute('''
-                        UPDATE players SET valorant_games = valorant_games + 1, valorant_losses = valorant_losses + 1
-                        WHERE user_id = ?
-                    ''', (user_id,))
-            elif game_type == "breachers":
-                if won:
-                    await db.execute('''
-                        UPDATE players SET breachers_games = breachers_games + 1, breachers_wins = breachers_wins + 1
-                        WHERE user_id = ?
-                    ''', (user_id,))
-                else:
-                    await db.execute('''
-                        UPDATE players SET breachers_games = breachers_games + 1, breachers_losses = breachers_losses + 1
-                        WHERE user_id = ?
-                    ''', (user_id,))
+        db = self.conn
+        async with self.lock:
+            await db.execute('''
+                INSERT INTO player_ratings (user_id, game, mmr, games, wins, losses) VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT (user_id, game) DO UPDATE SET
+                    games = games + 1, wins = wins + excluded.wins, losses = losses + excluded.losses
+            ''', (user_id, game_type, await self.get_player_mmr(user_id, game_type), int(won), int(not won)))
             await db.commit()
     
+    @timed
     async def get_player_stats(self, user_id, game_type):
-        async with aiosqlite.connect(self.db_path) as db:
-            if game_type == "r6":
-                cursor = await db.execute('''
-                    SELECT r6_mmr, r6_games, r6_wins, r6_losses FROM players WHERE user_id = ?
-                ''', (user_id,))
-            elif game_type == "rl":
-                cursor = await db.execute('''
-                    SELECT rl_mmr, rl_games, rl_wins, rl_losses FROM players WHERE user_id = ?
-                ''', (user_id,))
-            elif game_type == "valorant":
-                cursor = await db.execute('''
-                    SELECT valorant_mmr, valorant_games, valorant_wins, valorant_losses FROM players WHERE user_id = ?
-                ''', (user_id,))
-            elif game_type == "breachers":
-                cursor = await db.execute('''
-                    SELECT breachers_mmr, breachers_games, breachers_wins, breachers_losses FROM players WHERE user_id = ?
-                ''', (user_id,))
-            
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('''
+                SELECT games, wins, losses FROM player_ratings WHERE user_id = ? AND game = ?
+            ''', (user_id, game_type))
             result = await cursor.fetchone()
-            if result:
-                return {
-                    'mmr': result[0],
-                    'games_played': result[1],
-                    'wins': result[2],
-                    'losses': result[3]
-                }
-            else:
-                await db.execute('INSERT INTO players (user_id) VALUES (?)', (user_id,))
-                await db.commit()
-                return {
-                    'mmr': 500,
-                    'games_played': 0,
-                    'wins': 0,
-                    'losses': 0
-                }
+        
+        games, wins, losses = result if result else (0, 0, 0)
+        return {
+            'mmr': await self.get_player_mmr(user_id, game_type),
+            'games_played': games,
+            'wins': wins,
+            'losses': losses
+        }
     
+    @timed
     async def save_match(self, game_type, queue_number, team1, team2, winner, mmr_changes):
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                INSERT INTO matches (game_type, queue_number, team1_players, team2_players, winner, mmr_changes)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (game_type, queue_number, str(team1), str(team2), winner, str(mmr_changes)))
+        db = self.conn
+        async with self.lock:
+            match_id = await self.insert_match(db, game_type, queue_number, team1, team2, winner, mmr_changes)
             await db.commit()
+            return match_id
+    
+    @timed
+    async def get_players_mmr(self, user_ids, game_type):
+        ratings = self.cache.game_ratings(game_type)
+        return {user_id: ratings.get(user_id, 500) for user_id in user_ids}
+    
+    @timed
+    async def finalize_match(self, game_type, queue_number, team1, team2, winner, compute_changes, reason="Match result"):
+        winners = set(team1 if winner == 1 else team2)
+        
+        db = self.conn
+        async with self.lock:
+            # Ratings are read under the lock, so a penalty or admin change that
+            # landed while the vote was closing is included rather than overwritten.
+            ratings = self.cache.game_ratings(game_type)
+            old_mmrs = {player_id: ratings.get(player_id, 500) for player_id in team1 + team2}
+            mmr_changes = compute_changes(old_mmrs)
+            new_mmrs = {
+                player_id: max(0, old_mmrs[player_id] + change)
+                for player_id, change in mmr_changes.items()
+            }
+            
+            # Rating changes still waiting in the journal are written first so they
+            # land in the same transaction and cannot overwrite these results later.
+            entries = self.cache.take_pending()
+            try:
+                if entries:
+                    await self.write_rating_entries(db, entries)
+                await db.executemany('''
+                    INSERT INTO player_ratings (user_id, game, mmr, games, wins, losses) VALUES (?, ?, ?, 1, ?, ?)
+                    ON CONFLICT (user_id, game) DO UPDATE SET
+                        mmr = excluded.mmr, games = games + 1,
+                        wins = wins + excluded.wins, losses = losses + excluded.losses
+                ''', [
+                    (player_id, game_type, new_mmr, int(player_id in winners), int(player_id not in winners))
+                    for player_id, new_mmr in new_mmrs.items()
+                ])
+                await db.executemany('''
+                    INSERT INTO mmr_history (user_id, game_type, old_mmr, new_mmr, change_reason)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', [
+                    (player_id, game_type, old_mmrs[player_id], new_mmr, reason)
+                    for player_id, new_mmr in new_mmrs.items()
+                ])
+                await self.insert_match(
+                    db, game_type, queue_number, team1, team2, winner,
+                    {player_id: new_mmr - old_mmrs[player_id] for player_id, new_mmr in new_mmrs.items()},
+                    old_mmrs
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            
+            self.cache.mark_flushed(entries)
+            for player_id, new_mmr in new_mmrs.items():
+                self.cache.set(player_id, game_type, new_mmr)
+        
+        return mmr_changes
+    
+    @timed
+    async def adjust_ratings(self, game_type, adjustments, reason):
+        db = self.conn
+        async with self.lock:
+            ratings = self.cache.game_ratings(game_type)
+            old_mmrs = {player_id: ratings.get(player_id, 500) for player_id in adjustments}
+            new_mmrs = {
+                player_id: max(0, old_mmrs[player_id] + change)
+                for player_id, change in adjustments.items()
+            }
+            
+            entries = self.cache.take_pending()
+            try:
+                if entries:
+                    await self.write_rating_entries(db, entries)
+                await db.executemany('''
+                    INSERT INTO player_ratings (user_id, game, mmr) VALUES (?, ?, ?)
+                    ON CONFLICT (user_id, game) DO UPDATE SET mmr = excluded.mmr
+                ''', [(player_id, game_type, new_mmr) for player_id, new_mmr in new_mmrs.items()])
+                await db.executemany('''
+                    INSERT INTO mmr_history (user_id, game_type, old_mmr, new_mmr, change_reason, changed_at)
+                    VALUES (?, ?, ?, ?, ?, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+                ''', [
+                    (player_id, game_type, old_mmrs[player_id], new_mmr, reason)
+                    for player_id, new_mmr in new_mmrs.items()
+                ])
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            
+            self.cache.mark_flushed(entries)
+            for player_id, new_mmr in new_mmrs.items():
+                self.cache.set(player_id, game_type, new_mmr)
+        
+        return new_mmrs
     
+    @timed
     async def create_party(self, party_name, captain_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        db = self.conn
+        async with self.lock:
+            try:
+                cursor = await db.execute('''
+                    INSERT INTO parties (name, captain_id)
+                    VALUES (?, ?)
+                ''', (party_name, captain_id))
+            except sqlite3.IntegrityError:
+                return False
+            
             await db.execute('''
-                INSERT INTO parties (party_name, captain_id, member_id)
-                VALUES (?, ?, ?)
-            ''', (party_name, captain_id, captain_id))
+                INSERT INTO party_members (party_id, member_id)
+                VALUES (?, ?)
+            ''', (cursor.lastrowid, captain_id))
             await db.commit()
+            self.parties.create(party_name, captain_id)
+            return True
     
+    @timed
     async def add_party_member(self, party_name, captain_id, member_id):
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                INSERT INTO parties (party_name, captain_id, member_id)
-                VALUES (?, ?, ?)
-            ''', (party_name, captain_id, member_id))
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('''
+                INSERT OR IGNORE INTO party_members (party_id, member_id)
+                SELECT party_id, ? FROM parties
+                WHERE captain_id = ? AND name = ?
+            ''', (member_id, captain_id, party_name))
             await db.commit()
+            if cursor.rowcount == 0:
+                return False
+            
+            self.parties.add_member(party_name, captain_id, member_id)
+            return True
     
+    @timed
     async def get_party_members(self, party_name, captain_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        db = self.conn
+        async with self.lock:
             cursor = await db.execute('''
-                SELECT member_id FROM parties 
-                WHERE party_name = ? AND captain_id = ?
-            ''', (party_name, captain_id))
+                SELECT m.member_id FROM parties p
+                JOIN party_members m ON m.party_id = p.party_id
+                WHERE p.captain_id = ? AND p.name = ?
+                ORDER BY m.rowid
+            ''', (captain_id, party_name))
             results = await cursor.fetchall()
             return [row[0] for row in results]
     
+    @timed
+    async def get_member_party(self, user_id, party_name):
+        # The party called party_name that user_id belongs to, as
+        # (captain_id, member_ids), found through the member_id index.
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('''
+                SELECT p.captain_id, others.member_id
+                FROM party_members m
+                JOIN parties p ON p.party_id = m.party_id
+                JOIN party_members others ON others.party_id = p.party_id
+                WHERE m.member_id = ? AND p.name = ?
+                ORDER BY p.party_id, others.rowid
+            ''', (user_id, party_name))
+            results = await cursor.fetchall()
+            if not results:
+                return None
+            
+            captain_id = results[0][0]
+            return captain_id, [member_id for cap_id, member_id in results if cap_id == captain_id]
+    
+    @timed
     async def get_user_parties(self, user_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        db = self.conn
+        async with self.lock:
             cursor = await db.execute('''
-                SELECT DISTINCT party_name, captain_id FROM parties 
-                WHERE member_id = ?
+                SELECT p.name, p.captain_id FROM party_members m
+                JOIN parties p ON p.party_id = m.party_id
+                WHERE m.member_id = ?
             ''', (user_id,))
             return await cursor.fetchall()
     
+    @timed
     async def get_created_parties(self, user_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        db = self.conn
+        async with self.lock:
             cursor = await db.execute('''
-                SELECT DISTINCT party_name FROM parties 
+                SELECT name FROM parties 
                 WHERE captain_id = ?
             ''', (user_id,))
             results = await cursor.fetchall()
             return [row[0] for row in results]
     
+    @timed
     async def delete_party(self, party_name, captain_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        db = self.conn
+        async with self.lock:
             await db.execute('''
                 DELETE FROM parties 
-                WHERE party_name = ? AND captain_id = ?
-            ''', (party_name, captain_id))
+                WHERE captain_id = ? AND name = ?
+            ''', (captain_id, party_name))
             await db.commit()
+            self.parties.delete(party_name, captain_id)
     
+    @timed
     async def remove_party_member(self, party_name, captain_id, member_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        db = self.conn
+        async with self.lock:
             await db.execute('''
-                DELETE FROM parties 
-                WHERE party_name = ? AND captain_id = ? AND member_id = ?
-            ''', (party_name, captain_id, member_id))
+                DELETE FROM party_members 
+                WHERE member_id = ? AND party_id = (
+                    SELECT party_id FROM parties WHERE captain_id = ? AND name = ?
+                )
+            ''', (member_id, captain_id, party_name))
             await db.commit()
+            self.parties.remove_member(party_name, captain_id, member_id)
     
     async def is_party_captain(self, party_name, user_id):
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute('''
-                SELECT captain_id FROM parties 
-                WHERE party_name = ? AND captain_id = ? LIMIT 1
-            ''', (party_name, user_id))
-            result = await cursor.fetchone()
-            return result is not None
+        return await self.party_exists(party_name, user_id)
     
+    @timed
     async def party_exists(self, party_name, captain_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        db = self.conn
+        async with self.lock:
             cursor = await db.execute('''
-                SELECT COUNT(*) FROM parties 
-                WHERE party_name = ? AND captain_id = ?
-            ''', (party_name, captain_id))
+                SELECT 1 FROM parties 
+                WHERE captain_id = ? AND name = ?
+            ''', (captain_id, party_name))
             result = await cursor.fetchone()
-            return result[0] > 0
+            return result is not None
     
+    @timed
     async def get_party_count(self, party_name, captain_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        db = self.conn
+        async with self.lock:
             cursor = await db.execute('''
-                SELECT COUNT(*) FROM parties
-                WHERE party_name = ? AND captain_id = ?
-            ''', (party_name, captain_id))
+                SELECT COUNT(*) FROM parties p
+                JOIN party_members m ON m.party_id = p.party_id
+                WHERE p.captain_id = ? AND p.name = ?
+            ''', (captain_id, party_name))
             result = await cursor.fetchone()
             return result[0]
 
+    @timed
+    async def get_replay_matches(self, game_type):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('''
+                SELECT m.match_id, m.winner, m.created_at, m.history_seq, p.user_id, p.team
+                FROM matches m JOIN match_participants p ON p.match_id = m.match_id
+                WHERE m.game_type = ?
+                ORDER BY m.created_at, m.match_id
+            ''', (game_type,))
+            rows = await cursor.fetchall()
+        
+        matches = {}
+        for match_id, winner, created_at, history_seq, user_id, team in rows:
+            if match_id not in matches:
+                matches[match_id] = ([], [], winner, created_at, history_seq)
+            matches[match_id][team - 1].append(user_id)
+        return list(matches.values())
+    
+    @timed
+    async def get_history_events(self, game_type, reason):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('''
+                SELECT user_id, changed_at, history_id FROM mmr_history
+                WHERE game_type = ? AND change_reason = ?
+                ORDER BY changed_at, history_id
+            ''', (game_type, reason))
+            return await cursor.fetchall()
+    
+    @timed
+    async def replace_ratings(self, game_type, ratings, reason="Rating replay"):
+        ratings_before = dict(self.cache.game_ratings(game_type))
+        
+        db = self.conn
+        async with self.lock:
+            entries = self.cache.take_pending()
+            try:
+                if entries:
+                    await self.write_rating_entries(db, entries)
+                await db.execute(
+                    'UPDATE player_ratings SET mmr = 500, games = 0, wins = 0, losses = 0 WHERE game = ?',
+                    (game_type,)
+                )
+                await db.executemany('''
+                    INSERT INTO player_ratings (user_id, game, mmr, games, wins, losses) VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, game) DO UPDATE SET
+                        mmr = excluded.mmr, games = excluded.games, wins = excluded.wins, losses = excluded.losses
+                ''', [
+                    (user_id, game_type, mmr, games, wins, losses)
+                    for user_id, (mmr, games, wins, losses) in ratings.items()
+                ])
+                
+                new_ratings = {user_id: 500 for user_id in ratings_before}
+                new_ratings.update({user_id: values[0] for user_id, values in ratings.items()})
+                await db.executemany('''
+                    INSERT INTO mmr_history (user_id, game_type, old_mmr, new_mmr, change_reason)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', [
+                    (user_id, game_type, ratings_before.get(user_id, 500), new_mmr, reason)
+                    for user_id, new_mmr in new_ratings.items()
+                    if ratings_before.get(user_id, 500) != new_mmr
+                ])
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            
+            self.cache.mark_flushed(entries)
+            for user_id, new_mmr in new_ratings.items():
+                self.cache.set(user_id, game_type, new_mmr)
+        
+        return new_ratings
+    
+    @timed
+    async def get_player_matches(self, user_id, game_type, limit=10):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('''
+                SELECT m.match_id, m.queue_number, m.winner, m.created_at, p.team, p.mmr_before, p.mmr_delta
+                FROM match_participants p JOIN matches m ON m.match_id = p.match_id
+                WHERE p.user_id = ? AND m.game_type = ?
+                ORDER BY p.match_id DESC
+                LIMIT ?
+            ''', (user_id, game_type, limit))
+            return await cursor.fetchall()
+    
+    @timed
+    async def get_match_participants(self, match_id):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('''
+                SELECT user_id, team, mmr_before, mmr_delta FROM match_participants
+                WHERE match_id = ?
+                ORDER BY team
+            ''', (match_id,))
+            return await cursor.fetchall()
+    
+    @timed
     async def get_top_mmr_players(self, game_type, limit=10):
-        async with aiosqlite.connect(self.db_path) as db:
-            if game_type == "r6":
-                cursor = await db.execute('''
-                    SELECT user_id, r6_mmr FROM players
-                    ORDER BY r6_mmr DESC
-                    LIMIT ?
-                ''', (limit,))
-            elif game_type == "rl":
-                cursor = await db.execute('''
-                    SELECT user_id, rl_mmr FROM players
-                    ORDER BY rl_mmr DESC
-                    LIMIT ?
-                ''', (limit,))
-            elif game_type == "valorant":
-                cursor = await db.execute('''
-                    SELECT user_id, valorant_mmr FROM players
-                    ORDER BY valorant_mmr DESC
-                    LIMIT ?
-                ''', (limit,))
-            elif game_type == "breachers":
-                cursor = await db.execute('''
-                    SELECT user_id, breachers_mmr FROM players
-                    ORDER BY breachers_mmr DESC
-                    LIMIT ?
-                ''', (limit,))
-
-            results = await cursor.fetchall()
-            return results
\ No newline at end of file
+        return self.cache.game_ranks(game_type).top(limit)
+    
+    @timed
+    async def save_deadline(self, key, kind, due_at, payload):
+        db = self.conn
+        async with self.lock:
+            await db.execute('''
+                INSERT INTO scheduled_deadlines (key, kind, due_at, payload) VALUES (?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET kind = excluded.kind, due_at = excluded.due_at, payload = excluded.payload
+            ''', (key, kind, due_at, payload))
+            await db.commit()
+    
+    @timed
+    async def delete_deadline(self, key):
+        db = self.conn
+        async with self.lock:
+            await db.execute('DELETE FROM scheduled_deadlines WHERE key = ?', (key,))
+            await db.commit()
+    
+    @timed
+    async def get_deadlines(self):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('SELECT key, kind, due_at, payload FROM scheduled_deadlines')
+            return await cursor.fetchall()
+    
+    @timed
+    async def get_match_counters(self):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute("SELECT key, value FROM bot_state WHERE key LIKE 'match_counter:%'")
+            return {key.split(':', 1)[1]: value for key, value in await cursor.fetchall()}
+    
+    @timed
+    async def set_match_counter(self, prefix, value):
+        db = self.conn
+        async with self.lock:
+            await db.execute('''
+                INSERT INTO bot_state (key, value) VALUES (?, ?)
+                ON CONFLICT (key) DO UPDATE SET value = excluded.value
+            ''', (f"match_counter:{prefix}", value))
+            await db.commit()
+    
+    @timed
+    async def add_queue_members(self, queue_key, user_ids):
+        group_id = user_ids[0] if len(user_ids) > 1 else None
+        db = self.conn
+        async with self.lock:
+            await db.executemany(
+                'INSERT OR IGNORE INTO queue_members (queue_key, user_id, group_id) VALUES (?, ?, ?)',
+                [(queue_key, user_id, group_id) for user_id in user_ids]
+            )
+            await db.commit()
+    
+    @timed
+    async def remove_queue_members(self, queue_key, user_ids):
+        db = self.conn
+        async with self.lock:
+            await db.executemany(
+                'DELETE FROM queue_members WHERE queue_key = ? AND user_id = ?',
+                [(queue_key, user_id) for user_id in user_ids]
+            )
+            await db.commit()
+    
+    @timed
+    async def get_queue_members(self):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('''
+                SELECT queue_key, user_id, CAST(strftime('%s', joined_at) AS REAL), group_id FROM queue_members
+                ORDER BY joined_at, rowid
+            ''')
+            return await cursor.fetchall()
+    
+    @timed
+    async def save_active_match(self, channel_id, queue_key, queue_number, phase, message_id, state):
+        db = self.conn
+        async with self.lock:
+            await db.execute('''
+                INSERT INTO active_matches (channel_id, queue_key, queue_number, phase, message_id, state)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (channel_id) DO UPDATE SET
+                    phase = excluded.phase, message_id = excluded.message_id,
+                    state = excluded.state, updated_at = CURRENT_TIMESTAMP
+            ''', (channel_id, queue_key, queue_number, phase, message_id, state))
+            await db.commit()
+    
+    @timed
+    async def delete_active_match(self, channel_id):
+        db = self.conn
+        async with self.lock:
+            await db.execute('DELETE FROM active_matches WHERE channel_id = ?', (channel_id,))
+            await db.commit()
+    
+    @timed
+    async def get_active_matches(self):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute(
+                'SELECT channel_id, queue_key, queue_number, phase, message_id, state FROM active_matches'
+            )
+            return await cursor.fetchall()
+    
+    @timed
+    async def add_pooled_channel(self, channel_id, category_id):
+        db = self.conn
+        async with self.lock:
+            await db.execute(
+                'INSERT OR REPLACE INTO pooled_channels (channel_id, category_id) VALUES (?, ?)',
+                (channel_id, category_id)
+            )
+            await db.commit()
+    
+    @timed
+    async def remove_pooled_channel(self, channel_id):
+        db = self.conn
+        async with self.lock:
+            await db.execute('DELETE FROM pooled_channels WHERE channel_id = ?', (channel_id,))
+            await db.commit()
+    
+    @timed
+    async def get_pooled_channels(self):
+        db = self.conn
+        async with self.lock:
+            cursor = await db.execute('SELECT channel_id, category_id FROM pooled_channels')
+            return await cursor.fetchall()
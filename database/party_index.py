@@ -0,0 +1,99 @@
+from bisect import bisect_left
+
+class PartyIndex:
+    def __init__(self):
+        self.parties = {}
+        self.by_member = {}
+        self.sorted_names = {}
+        self.hits = 0
+        self.misses = 0
+
+    # Parties are keyed by (captain_id, party_name) like the table, and members
+    # keep their insertion order so the captain is always listed first.
+    def load(self, rows):
+        self.parties.clear()
+        self.by_member.clear()
+        self.sorted_names.clear()
+        for party_name, captain_id, member_id in rows:
+            self.add_member(party_name, captain_id, member_id)
+
+    def create(self, party_name, captain_id):
+        self.add_member(party_name, captain_id, captain_id)
+
+    def add_member(self, party_name, captain_id, member_id):
+        members = self.parties.setdefault((captain_id, party_name), [])
+        if member_id not in members:
+            members.append(member_id)
+        self.by_member.setdefault(member_id, set()).add((captain_id, party_name))
+        self.forget_names(member_id)
+
+    def remove_member(self, party_name, captain_id, member_id):
+        key = (captain_id, party_name)
+        members = self.parties.get(key)
+        if members is None or member_id not in members:
+            return
+
+        members.remove(member_id)
+        self.forget(member_id, key)
+        if not members:
+            del self.parties[key]
+
+    def delete(self, party_name, captain_id):
+        key = (captain_id, party_name)
+        for member_id in self.parties.pop(key, []):
+            self.forget(member_id, key)
+
+    def forget(self, member_id, key):
+        self.forget_names(member_id)
+        keys = self.by_member.get(member_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_member[member_id]
+
+    def members(self, party_name, captain_id):
+        return list(self.parties.get((captain_id, party_name), []))
+
+    def user_parties(self, user_id):
+        return sorted((party_name, captain_id) for captain_id, party_name in self.by_member.get(user_id, ()))
+
+    def created_parties(self, captain_id):
+        return sorted(party_name for cap_id, party_name in self.by_member.get(captain_id, ()) if cap_id == captain_id)
+
+    def forget_names(self, user_id):
+        self.sorted_names.pop(("created", user_id), None)
+        self.sorted_names.pop(("member", user_id), None)
+
+    # Autocomplete fires on every keystroke, so each user's party names are kept
+    # sorted by folded case until one of their parties changes, and a prefix
+    # lookup is a binary search followed by a short scan.
+    def complete(self, user_id, current, created=False, limit=25):
+        key = ("created" if created else "member", user_id)
+        names = self.sorted_names.get(key)
+        if names is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if created:
+                party_names = self.created_parties(user_id)
+            else:
+                party_names = [party_name for party_name, captain_id in self.user_parties(user_id)]
+            ordered = sorted(set(party_names), key=lambda name: (name.lower(), name))
+            names = self.sorted_names[key] = (ordered, [name.lower() for name in ordered])
+
+        ordered, folded = names
+        prefix = current.lower()
+        matches = []
+        for position in range(bisect_left(folded, prefix), len(folded)):
+            if len(matches) == limit or not folded[position].startswith(prefix):
+                break
+            matches.append(ordered[position])
+        return matches
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0
+        }
@@ -0,0 +1,50 @@
+from bisect import bisect_left, insort
+
+class RankIndex:
+    def __init__(self, ratings=None):
+        self.scores = {}
+        self.entries = []
+        if ratings:
+            self.load(ratings)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Entries are kept sorted as (-mmr, user_id), so the highest MMR is first and
+    # ties always break the same way. A player's rank is then a binary search.
+    def load(self, ratings):
+        self.scores = dict(ratings)
+        self.entries = sorted((-mmr, user_id) for user_id, mmr in self.scores.items())
+
+    def set(self, user_id, mmr):
+        old_mmr = self.scores.get(user_id)
+        if old_mmr == mmr:
+            return
+
+        if old_mmr is not None:
+            del self.entries[bisect_left(self.entries, (-old_mmr, user_id))]
+
+        self.scores[user_id] = mmr
+        insort(self.entries, (-mmr, user_id))
+
+    def remove(self, user_id):
+        old_mmr = self.scores.pop(user_id, None)
+        if old_mmr is None:
+            return False
+        del self.entries[bisect_left(self.entries, (-old_mmr, user_id))]
+        return True
+
+    def rank(self, user_id):
+        mmr = self.scores.get(user_id)
+        if mmr is None:
+            return None
+        return bisect_left(self.entries, (-mmr, user_id)) + 1
+
+    def top(self, count, start=0):
+        return [(user_id, -mmr) for mmr, user_id in self.entries[start:start + count]]
+
+    def copy(self):
+        index = RankIndex()
+        index.scores = dict(self.scores)
+        index.entries = list(self.entries)
+        return index
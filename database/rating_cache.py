@@ -0,0 +1,93 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from database.rank_index import RankIndex
+
+class RatingCache:
+    def __init__(self, journal_path, fsync=True):
+        self.journal_path = journal_path
+        self.fsync = fsync
+        self.ratings = {}
+        self.ranks = {}
+        self.pending = []
+        self.last_seq = 0
+        self.journal = None
+
+    def load(self, rows):
+        self.ratings.clear()
+        for user_id, game, mmr in rows:
+            self.ratings.setdefault(game, {})[user_id] = mmr
+
+        self.ranks = {game: RankIndex(ratings) for game, ratings in self.ratings.items()}
+
+    def get(self, user_id, game):
+        return self.ratings.get(game, {}).get(user_id)
+
+    def set(self, user_id, game, mmr):
+        self.ratings.setdefault(game, {})[user_id] = mmr
+        self.ranks.setdefault(game, RankIndex()).set(user_id, mmr)
+
+    def game_ratings(self, game):
+        return self.ratings.get(game, {})
+
+    def game_ranks(self, game):
+        return self.ranks.get(game) or RankIndex()
+
+    def read_journal(self, after_seq):
+        # Entries up to after_seq already reached SQLite before the last shutdown or
+        # crash. A torn final line means the write never completed, so it is dropped.
+        entries = []
+        if not os.path.exists(self.journal_path):
+            return entries
+
+        with open(self.journal_path, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if entry['seq'] > after_seq:
+                    entries.append(entry)
+
+        return entries
+
+    def open_journal(self, last_seq):
+        self.last_seq = last_seq
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    async def record(self, user_id, game, old_mmr, new_mmr, reason):
+        self.last_seq += 1
+        entry = {
+            'seq': self.last_seq,
+            'user_id': user_id,
+            'game': game,
+            'old_mmr': old_mmr,
+            'new_mmr': new_mmr,
+            'reason': reason,
+            'at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        }
+
+        self.set(user_id, game, new_mmr)
+        self.pending.append(entry)
+
+        self.journal.write(json.dumps(entry) + '\n')
+        self.journal.flush()
+        if self.fsync:
+            await asyncio.to_thread(os.fsync, self.journal.fileno())
+
+        return entry
+
+    def take_pending(self):
+        return list(self.pending)
+
+    def mark_flushed(self, entries):
+        del self.pending[:len(entries)]
+        if not self.pending:
+            self.journal.truncate(0)
+            self.journal.seek(0)
@@ -5,6 +5,12 @@ import os
 from dotenv import load_dotenv
 from database.database import DatabaseManager
 from utils.mmr_system import MMRSystem
+from utils.scheduler import Scheduler
+from utils.leaderboard import LeaderboardService
+from utils.user_resolver import UserResolver
+from utils.channel_pool import ChannelPool
+from utils.rest_scheduler import RestScheduler
+from utils.metrics import Metrics
 
 load_dotenv()
 
@@ -16,30 +22,65 @@ class Multiverse(commands.Bot):
         
         super().__init__(command_prefix='!', intents=intents)
         
-        self.db = DatabaseManager()
+        self.metrics = Metrics(
+            host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            port=int(os.getenv("METRICS_PORT", 9108))
+        )
+        self.db = DatabaseManager(profile=os.getenv("DB_PROFILE", "balanced"), metrics=self.metrics)
         self.mmr_system = MMRSystem(self.db)
-        self.r6_counter = 1
-        self.rl_counter = 1
-        self.valorant_counter = 1
-        self.breachers_counter = 1
+        self.scheduler = Scheduler(self.db)
+        self.leaderboard = LeaderboardService(self.db)
+        self.rest = RestScheduler(concurrency=int(os.getenv("REST_CONCURRENCY", 8)), metrics=self.metrics)
+        self.profiles = UserResolver(self)
+        self.channel_pool = ChannelPool(
+            self,
+            self.db,
+            min_size=int(os.getenv("CHANNEL_POOL_MIN", 0)),
+            max_size=int(os.getenv("CHANNEL_POOL_MAX", 0))
+        )
+        self.metrics.add_collector(
+            lambda metrics: metrics.set("multiverse_rest_queue_depth", self.rest.depth())
+        )
+        self.match_counters = {
+            "r6": 1,
+            "rl": 1,
+            "valorant": 1,
+            "breachers": 1
+        }
         
     async def setup_hook(self):
         await self.db.initialize()
+        self.match_counters.update(await self.db.get_match_counters())
 
-        await self.load_extension('cogs.r6_queue')
-        await self.load_extension('cogs.rocketleague_queue')
-        await self.load_extension('cogs.valorant_queue')
-        await self.load_extension('cogs.breachers_queue')
+        await self.load_extension('cogs.queue')
         await self.load_extension('cogs.parties')
         await self.load_extension('cogs.admin')
         await self.load_extension('cogs.leaderboard')
 
+        await self.scheduler.start()
+        await self.channel_pool.start()
+        await self.metrics.start()
+
         await self.tree.sync()
         print(f"Synced commands for {self.user}")
     
+    async def close(self):
+        await super().close()
+        await self.scheduler.stop()
+        await self.channel_pool.stop()
+        await self.rest.stop()
+        await self.metrics.stop()
+        await self.db.close()
+    
     async def on_ready(self):
         print(f'{self.user} has logged in!')
 
+    async def on_user_update(self, before, after):
+        self.profiles.invalidate(after.id)
+
+    async def on_member_update(self, before, after):
+        self.profiles.invalidate(after.id)
+
     async def on_message(self, message):
         if message.author.bot:
             return
@@ -0,0 +1,144 @@
+import asyncio
+import discord
+from utils.rest_scheduler import CRITICAL, BACKGROUND
+
+REPLENISH_INTERVAL = 60
+POOL_CHANNEL_NAME = "match-pool"
+
+class ChannelPool:
+    def __init__(self, bot, db, min_size=0, max_size=0):
+        self.bot = bot
+        self.db = db
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.categories = set()
+        self.idle = {}
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def register(self, category_id):
+        self.categories.add(category_id)
+        self.idle.setdefault(category_id, [])
+        self.wakeup.set()
+
+    async def start(self):
+        if self.enabled and self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def hidden_overwrites(self, guild):
+        return {guild.default_role: discord.PermissionOverwrite(read_messages=False)}
+
+    async def load(self):
+        for channel_id, category_id in await self.db.get_pooled_channels():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None or category_id not in self.categories:
+                await self.db.remove_pooled_channel(channel_id)
+                continue
+            self.idle[category_id].append(channel_id)
+
+    async def run(self):
+        await self.bot.wait_until_ready()
+        await self.load()
+
+        while True:
+            self.wakeup.clear()
+            for category_id in list(self.categories):
+                await self.replenish(category_id)
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), REPLENISH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    # Channels are created one at a time in the background so refilling the pool
+    # never competes with a match that is starting right now.
+    async def replenish(self, category_id):
+        category = self.bot.get_channel(category_id)
+        if category is None:
+            return
+
+        while len(self.idle[category_id]) < self.min_size:
+            try:
+                channel = await self.bot.rest.request(
+                    lambda: category.create_text_channel(
+                        POOL_CHANNEL_NAME,
+                        overwrites=self.hidden_overwrites(category.guild)
+                    ),
+                    BACKGROUND
+                )
+            except Exception as e:
+                print(f"Failed to pre-create a channel in {category.name}: {e}")
+                return
+
+            await self.db.add_pooled_channel(channel.id, category_id)
+            self.idle[category_id].append(channel.id)
+
+    async def checkout(self, category, name, overwrites):
+        if not self.enabled or category is None or category.id not in self.categories:
+            return None
+
+        idle = self.idle[category.id]
+        while idle:
+            channel_id = idle.pop()
+            await self.db.remove_pooled_channel(channel_id)
+            self.wakeup.set()
+
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                continue
+
+            try:
+                await self.bot.rest.request(lambda: channel.edit(name=name, overwrites=overwrites), CRITICAL)
+            except Exception as e:
+                print(f"Discarding pooled channel {channel_id}: {e}")
+                try:
+                    await self.bot.rest.request(channel.delete, BACKGROUND)
+                except:
+                    pass
+                continue
+
+            self.hits += 1
+            return channel
+
+        self.misses += 1
+        return None
+
+    async def release(self, channel):
+        if not self.enabled or channel.category_id not in self.categories:
+            return False
+
+        idle = self.idle[channel.category_id]
+        if len(idle) >= self.max_size:
+            return False
+
+        # Hide the channel before clearing it so nobody watches it being scrubbed.
+        try:
+            await self.bot.rest.request(
+                lambda: channel.edit(overwrites=self.hidden_overwrites(channel.guild)), BACKGROUND
+            )
+            await self.bot.rest.request(lambda: channel.purge(limit=None), BACKGROUND)
+        except Exception as e:
+            print(f"Could not scrub {channel.name} for reuse: {e}")
+            return False
+
+        idle.append(channel.id)
+        await self.db.add_pooled_channel(channel.id, channel.category_id)
+        return True
+
+    def stats(self):
+        return {
+            'idle': {category_id: len(channel_ids) for category_id, channel_ids in self.idle.items()},
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,46 @@
+import time
+
+class LeaderboardService:
+    def __init__(self, db, page_size=10, ttl=30):
+        self.db = db
+        self.page_size = page_size
+        self.ttl = ttl
+        self.snapshots = {}
+
+    # Pages are served from a copy of the live rank index that is refreshed at
+    # most once per ttl, so everyone paging through a board sees the same order
+    # and repeated /leaderboard calls never reach SQLite.
+    def snapshot(self, game):
+        built_at, ranks = self.snapshots.get(game, (None, None))
+        if built_at is None or time.monotonic() - built_at > self.ttl:
+            ranks = self.db.cache.game_ranks(game).copy()
+            self.snapshots[game] = (time.monotonic(), ranks)
+        return ranks
+
+    def invalidate(self, game=None):
+        if game is None:
+            self.snapshots.clear()
+        else:
+            self.snapshots.pop(game, None)
+
+    def page_count(self, game):
+        return max(1, -(-len(self.snapshot(game)) // self.page_size))
+
+    def page(self, game, page):
+        ranks = self.snapshot(game)
+        page = max(0, min(page, self.page_count(game) - 1))
+        start = page * self.page_size
+        entries = [
+            (start + i + 1, user_id, mmr)
+            for i, (user_id, mmr) in enumerate(ranks.top(self.page_size, start))
+        ]
+        return page, entries
+
+    def rank(self, game, user_id):
+        return self.snapshot(game).rank(user_id)
+
+    def page_of(self, game, user_id):
+        rank = self.rank(game, user_id)
+        if rank is None:
+            return None
+        return (rank - 1) // self.page_size
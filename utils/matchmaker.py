@@ -0,0 +1,198 @@
+import time
+from bisect import bisect_left, insort
+from utils.queue_pool import QueuePool
+
+# How far apart the lowest and highest MMR in a match may be. The window starts
+# at BASE_WINDOW and grows with the longest wait in the queue, so a match is
+# always formed eventually even for players far from everyone else.
+BASE_WINDOW = 150
+WIDEN_PER_MINUTE = 150
+
+# Only the longest-waiting players are tried as anchors on each pass. Newer
+# players have narrower windows and were already tried when they joined.
+MAX_ANCHORS = 16
+
+WAIT_BANDS = ((60, "<1m"), (180, "1-3m"), (600, "3-10m"), (None, "10m+"))
+
+class Matchmaker:
+    def __init__(self, rating, base_window=BASE_WINDOW, widen_per_minute=WIDEN_PER_MINUTE, on_pop=None):
+        self.rating = rating
+        self.on_pop = on_pop
+        self.base_window = base_window
+        self.widen_per_minute = widen_per_minute
+        self.pool = QueuePool()
+        self.index = []
+        self.entries = {}
+        self.entry_of = {}
+        self.history = {label: {'matches': 0, 'spread_total': 0, 'wait_total': 0.0} for _, label in WAIT_BANDS}
+
+    def __len__(self):
+        return len(self.pool)
+
+    def __contains__(self, user_id):
+        return user_id in self.pool
+
+    def __iter__(self):
+        return iter(self.pool)
+
+    def position(self, user_id):
+        return self.pool.position(user_id)
+
+    def peek(self, count):
+        return self.pool.peek(count)
+
+    def group_of(self, user_id):
+        key = self.entry_of.get(user_id)
+        return self.entries[key]['members'] if key is not None else None
+
+    def append(self, user_id, joined_at=None):
+        return self.append_group([user_id], joined_at)
+
+    # A party is one entry in the index, at its average MMR, so it can only be
+    # matched as a whole. Its key is the first member's id.
+    def append_group(self, user_ids, joined_at=None):
+        members = tuple(user_ids)
+        if not members or any(user_id in self.pool for user_id in members):
+            return False
+
+        mmr = sum(self.rating(user_id) for user_id in members) / len(members)
+        key = members[0]
+        self.entries[key] = {
+            'members': members,
+            'mmr': mmr,
+            'joined_at': joined_at if joined_at is not None else time.time()
+        }
+        for user_id in members:
+            self.pool.append(user_id)
+            self.entry_of[user_id] = key
+        insort(self.index, (mmr, key))
+        return True
+
+    def remove(self, user_id):
+        key = self.entry_of.get(user_id)
+        if key is None:
+            return False
+
+        entry = self.entries.pop(key)
+        for member_id in entry['members']:
+            self.pool.remove(member_id)
+            del self.entry_of[member_id]
+        del self.index[bisect_left(self.index, (entry['mmr'], key))]
+        return True
+
+    def take(self, user_ids):
+        for user_id in user_ids:
+            self.remove(user_id)
+        return user_ids
+
+    def pop_front(self, count):
+        # Substitutes replace single players, so only solo entries are taken.
+        solos = []
+        for user_id in self.pool:
+            if len(solos) == count:
+                break
+            if len(self.group_of(user_id)) == 1:
+                solos.append(user_id)
+        return self.take(solos)
+
+    def solo_count(self):
+        return sum(1 for entry in self.entries.values() if len(entry['members']) == 1)
+
+    def window(self, key, now):
+        waited = max(0.0, now - self.entries[key]['joined_at'])
+        return self.base_window + self.widen_per_minute * waited / 60
+
+    def size_at(self, position):
+        return len(self.entries[self.index[position][1]]['members'])
+
+    # Parties cannot be split across teams, so a run only makes a match if some
+    # of its entries add up to exactly one team. Bit n of reachable is set when
+    # n players can be made from the entries seen so far.
+    def splittable(self, start, end, team_size):
+        reachable = 1
+        for position in range(start, end + 1):
+            reachable |= reachable << self.size_at(position)
+        return bool(reachable >> team_size & 1)
+
+    # The entries closest in MMR to the anchor always form a contiguous run of
+    # the sorted index, so only runs that contain the anchor and add up to
+    # exactly `size` players need checking. That is a binary search plus at
+    # most size * size steps, however long the queue is.
+    def tightest_run(self, anchor, size):
+        position = bisect_left(self.index, (self.entries[anchor]['mmr'], anchor))
+        best = None
+        best_spread = None
+        left_total = 0
+
+        for start in range(position, max(-1, position - size), -1):
+            left_total += self.size_at(start)
+            if left_total > size:
+                break
+
+            total = left_total
+            end = position
+            while total < size and end + 1 < len(self.index):
+                end += 1
+                total += self.size_at(end)
+
+            if total == size and self.splittable(start, end, size // 2):
+                spread = self.index[end][0] - self.index[start][0]
+                if best_spread is None or spread < best_spread:
+                    best = (start, end)
+                    best_spread = spread
+
+        return best, best_spread
+
+    def find_match(self, size, anchors=(), now=None):
+        if len(self.pool) < size:
+            return None
+
+        now = now if now is not None else time.time()
+        candidates = [self.entry_of.get(user_id) for user_id in list(anchors) + self.pool.peek(MAX_ANCHORS)]
+
+        for anchor in dict.fromkeys(candidates):
+            if anchor is None:
+                continue
+
+            run, spread = self.tightest_run(anchor, size)
+            if run is None or spread > self.window(anchor, now):
+                continue
+
+            keys = [key for _, key in self.index[run[0]:run[1] + 1]]
+            groups = [self.entries[key]['members'] for key in keys]
+            self.record(keys, spread, now)
+
+            players = [user_id for members in groups for user_id in members]
+            self.take(players)
+            return players, [list(members) for members in groups if len(members) > 1]
+
+        return None
+
+    def record(self, keys, spread, now):
+        waits = [
+            now - self.entries[key]['joined_at']
+            for key in keys
+            for _ in self.entries[key]['members']
+        ]
+        if self.on_pop is not None:
+            self.on_pop(waits)
+
+        longest_wait = max(waits)
+        for limit, label in WAIT_BANDS:
+            if limit is None or longest_wait < limit:
+                break
+
+        band = self.history[label]
+        band['matches'] += 1
+        band['spread_total'] += spread
+        band['wait_total'] += longest_wait
+
+    def stats(self):
+        return {
+            label: {
+                'matches': band['matches'],
+                'avg_spread': round(band['spread_total'] / band['matches'], 1) if band['matches'] else 0.0,
+                'avg_longest_wait': round(band['wait_total'] / band['matches'], 1) if band['matches'] else 0.0
+            }
+            for label, band in self.history.items()
+        }
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from utils.rest_scheduler import COSMETIC
+
+class MessageRenderer:
+    def __init__(self, render, rest=None, min_interval=1.5, metrics=None):
+        self.render = render
+        self.rest = rest
+        self.metrics = metrics
+        self.min_interval = min_interval
+        self.message = None
+        self.pending = None
+        self.closed = False
+        self.last_edit = 0.0
+
+    def invalidate(self):
+        if self.metrics is not None:
+            self.metrics.inc("multiverse_message_edits_total", outcome="requested")
+        if self.closed or self.pending is not None:
+            return
+        self.pending = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        # Everything invalidated while this waits is picked up by the single edit
+        # below, so a burst of clicks costs one API call instead of one per click.
+        delay = self.last_edit + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        self.pending = None
+        if self.closed or self.message is None:
+            return
+
+        self.last_edit = time.monotonic()
+        if self.metrics is not None:
+            self.metrics.inc("multiverse_message_edits_total", outcome="sent")
+        message = self.message
+        try:
+            if self.rest is None:
+                await message.edit(**self.render())
+            else:
+                await self.rest.request(lambda: message.edit(**self.render()), COSMETIC, key=("edit", message.id))
+        except:
+            pass
+
+    def close(self):
+        self.closed = True
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from bisect import bisect_left
+from aiohttp import web
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+WAIT_BUCKETS = (10, 30, 60, 120, 300, 600, 900, 1800, 3600)
+DURATION_BUCKETS = (300, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200)
+
+LAG_INTERVAL = 1
+
+DEFINITIONS = {
+    "multiverse_queue_depth": ("gauge", "Players waiting in each queue", None),
+    "multiverse_time_to_pop_seconds": ("histogram", "Time from joining a queue to being placed in a match", WAIT_BUCKETS),
+    "multiverse_ready_checks_total": ("counter", "Ready checks by outcome", None),
+    "multiverse_match_duration_seconds": ("histogram", "Time from teams being announced to the winner being decided", DURATION_BUCKETS),
+    "multiverse_db_call_seconds": ("histogram", "Latency of DatabaseManager calls", LATENCY_BUCKETS),
+    "multiverse_rest_request_seconds": ("histogram", "Time a Discord REST call took once started", LATENCY_BUCKETS),
+    "multiverse_rest_wait_seconds": ("histogram", "Time a Discord REST call waited in the scheduler", LATENCY_BUCKETS),
+    "multiverse_rest_queue_depth": ("gauge", "Discord REST calls waiting in the scheduler", None),
+    "multiverse_message_edits_total": ("counter", "Ready and vote message updates requested, and edits actually sent", None),
+    "multiverse_event_loop_lag_seconds": ("histogram", "How late the event loop woke a sleeping task", LATENCY_BUCKETS)
+}
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+class Metrics:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.values = {name: {} for name in DEFINITIONS}
+        self.collectors = []
+        self.runner = None
+        self.lag_task = None
+
+    def inc(self, name, value=1, **labels):
+        series = self.values[name]
+        key = label_key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        self.values[name][label_key(labels)] = value
+
+    # Histograms keep per-bucket counts rather than samples, so memory stays
+    # fixed however many observations come in.
+    def observe(self, name, value, **labels):
+        buckets = DEFINITIONS[name][2]
+        series = self.values[name]
+        key = label_key(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = {'buckets': [0] * (len(buckets) + 1), 'count': 0, 'sum': 0.0}
+        histogram['buckets'][bisect_left(buckets, value)] += 1
+        histogram['count'] += 1
+        histogram['sum'] += value
+
+    # Gauges that are cheaper to read on demand than to keep in step, like queue
+    # depth, are filled in by collectors right before a scrape or summary.
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def remove_collector(self, collector):
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def collect(self):
+        for collector in self.collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+
+    def render(self):
+        self.collect()
+        lines = []
+        for name, (kind, description, buckets) in DEFINITIONS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(self.values[name].items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{format_labels(key)} {value}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(buckets, value['buckets']):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{format_labels(key, [('le', '+Inf')])} {value['count']}")
+                lines.append(f"{name}_sum{format_labels(key)} {value['sum']}")
+                lines.append(f"{name}_count{format_labels(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def quantile(self, name, histogram, q):
+        buckets = DEFINITIONS[name][2]
+        target = histogram['count'] * q
+        cumulative = 0
+        for bound, count in zip(buckets, histogram['buckets']):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+    # Series are keyed by their label values joined with "/", e.g. "rl/2v2".
+    def summary(self, name):
+        self.collect()
+        result = {}
+        for key, value in sorted(self.values[name].items()):
+            label = "/".join(str(label_value) for _, label_value in key) or "total"
+            if DEFINITIONS[name][0] != "histogram":
+                result[label] = value
+                continue
+
+            result[label] = {
+                'count': value['count'],
+                'avg': value['sum'] / value['count'] if value['count'] else 0.0,
+                'p95': self.quantile(name, value, 0.95)
+            }
+        return result
+
+    async def handle_scrape(self, request):
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        if self.lag_task is None:
+            self.lag_task = asyncio.create_task(self.measure_lag())
+
+        if not self.port or self.runner is not None:
+            return
+
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_scrape)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as e:
+            print(f"Could not serve metrics on {self.host}:{self.port}: {e}")
+            await runner.cleanup()
+            return
+
+        self.runner = runner
+        print(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self.lag_task is not None:
+            self.lag_task.cancel()
+            self.lag_task = None
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def measure_lag(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.observe("multiverse_event_loop_lag_seconds", max(0.0, time.perf_counter() - started - LAG_INTERVAL))
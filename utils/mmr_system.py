@@ -1,10 +1,15 @@
+import asyncio
 import math
+import time
+from utils import team_balancer
+from utils import rating_replay
 
 class MMRSystem:
     def __init__(self, db_manager):
         self.db = db_manager
         self.k_factor = 25
         self.variance = 1600
+        self.ready_penalty = 80
     
     def calculate_expected_score(self, player_mmr, opponent_mmr):
         return 1 / (1 + 10**((opponent_mmr - player_mmr) / 400))
@@ -23,17 +28,9 @@ class MMRSystem:
     def calculate_team_average_mmr(self, team_mmrs):
         return sum(team_mmrs) / len(team_mmrs)
     
-    async def calculate_team_mmr_changes(self, team1_ids, team2_ids, winning_team, game_type):
-        team1_mmrs = []
-        team2_mmrs = []
-        
-        for player_id in team1_ids:
-            mmr = await self.db.get_player_mmr(player_id, game_type)
-            team1_mmrs.append(mmr)
-        
-        for player_id in team2_ids:
-            mmr = await self.db.get_player_mmr(player_id, game_type)
-            team2_mmrs.append(mmr)
+    def compute_team_mmr_changes(self, team1_ids, team2_ids, player_mmrs, winning_team):
+        team1_mmrs = [player_mmrs[player_id] for player_id in team1_ids]
+        team2_mmrs = [player_mmrs[player_id] for player_id in team2_ids]
         
         team1_avg = self.calculate_team_average_mmr(team1_mmrs)
         team2_avg = self.calculate_team_average_mmr(team2_mmrs)
@@ -56,31 +53,58 @@ class MMRSystem:
         
         return mmr_changes
     
+    async def calculate_team_mmr_changes(self, team1_ids, team2_ids, winning_team, game_type):
+        player_mmrs = await self.db.get_players_mmr(team1_ids + team2_ids, game_type)
+        return self.compute_team_mmr_changes(team1_ids, team2_ids, player_mmrs, winning_team)
+    
+    async def finalize_match(self, team1_ids, team2_ids, winning_team, game_type, queue_number):
+        return await self.db.finalize_match(
+            game_type, queue_number, team1_ids, team2_ids, winning_team,
+            lambda player_mmrs: self.compute_team_mmr_changes(team1_ids, team2_ids, player_mmrs, winning_team)
+        )
+    
+    async def apply_ready_penalties(self, player_ids, game_type):
+        if not player_ids:
+            return {}
+        return await self.db.adjust_ratings(
+            game_type, {player_id: -self.ready_penalty for player_id in player_ids}, "Failed to ready up"
+        )
+    
     async def apply_mmr_changes(self, mmr_changes, game_type, reason="Match result"):
         for player_id, change in mmr_changes.items():
             current_mmr = await self.db.get_player_mmr(player_id, game_type)
             new_mmr = max(0, current_mmr + change)
             await self.db.update_player_mmr(player_id, game_type, new_mmr, reason)
     
-    async def balance_teams(self, player_ids, game_type):
-        player_mmrs = []
-        for player_id in player_ids:
-            mmr = await self.db.get_player_mmr(player_id, game_type)
-            player_mmrs.append((player_id, mmr))
+    async def replay_ratings(self, game_type, apply=False):
+        start = time.perf_counter()
         
-        player_mmrs.sort(key=lambda x: x[1], reverse=True)
+        await self.db.flush()
+        match_rows = await self.db.get_replay_matches(game_type)
+        penalty_rows = await self.db.get_history_events(game_type, "Failed to ready up")
         
-        team1 = []
-        team2 = []
-        team1_mmr = 0
-        team2_mmr = 0
+        def run():
+            events = rating_replay.build_events(match_rows, penalty_rows)
+            return rating_replay.replay(events, self.k_factor, self.variance, self.ready_penalty)
         
-        for player_id, mmr in player_mmrs:
-            if team1_mmr <= team2_mmr:
-                team1.append(player_id)
-                team1_mmr += mmr
-            else:
-                team2.append(player_id)
-                team2_mmr += mmr
+        ratings, summary = await asyncio.to_thread(run)
+        
+        current = await self.db.get_players_mmr(list(ratings), game_type)
+        summary['changed'] = sum(1 for user_id, values in ratings.items() if current[user_id] != values[0])
+        
+        if apply:
+            await self.db.replace_ratings(game_type, ratings)
+        
+        summary['ratings'] = ratings
+        summary['seconds'] = time.perf_counter() - start
+        return summary
+    
+    async def balance_teams(self, player_ids, game_type, objective=team_balancer.average_difference, constraints=(), parties=()):
+        mmrs = await self.db.get_players_mmr(player_ids, game_type)
+        player_mmrs = [(player_id, mmrs[player_id]) for player_id in player_ids]
+        
+        parties = [party for party in parties if set(party) <= set(player_ids)]
+        if parties:
+            constraints = tuple(constraints) + (team_balancer.keep_together(parties),)
         
-        return team1, team2
\ No newline at end of file
+        return team_balancer.balance(player_mmrs, objective, constraints)
\ No newline at end of file
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from itertools import islice
+
+class QueuePool:
+    def __init__(self, user_ids=()):
+        self.members = OrderedDict()
+        self.capacity = 64
+        self.next_ticket = 0
+        self.tree = [0] * (self.capacity + 1)
+        for user_id in user_ids:
+            self.append(user_id)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, user_id):
+        return user_id in self.members
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __repr__(self):
+        return f"QueuePool({list(self.members)})"
+
+    # Every member holds an increasing ticket, and a Fenwick tree over the
+    # tickets counts who is still waiting. That makes a member's position a
+    # prefix sum, so leaving from the middle of the queue needs no rescan.
+    def update(self, ticket, delta):
+        index = ticket + 1
+        while index <= self.capacity:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix_count(self, ticket):
+        index = ticket + 1
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def rebuild(self):
+        self.capacity = max(64, len(self.members) * 2)
+        self.tree = [0] * (self.capacity + 1)
+        self.next_ticket = 0
+        for user_id in self.members:
+            self.members[user_id] = self.next_ticket
+            self.update(self.next_ticket, 1)
+            self.next_ticket += 1
+
+    def append(self, user_id):
+        if user_id in self.members:
+            return False
+
+        if self.next_ticket >= self.capacity:
+            self.rebuild()
+
+        self.members[user_id] = self.next_ticket
+        self.update(self.next_ticket, 1)
+        self.next_ticket += 1
+        return True
+
+    def remove(self, user_id):
+        ticket = self.members.pop(user_id, None)
+        if ticket is None:
+            return False
+        self.update(ticket, -1)
+        return True
+
+    def peek(self, count):
+        return list(islice(self.members, count))
+
+    def pop_front(self, count):
+        popped = []
+        while self.members and len(popped) < count:
+            user_id, ticket = self.members.popitem(last=False)
+            self.update(ticket, -1)
+            popped.append(user_id)
+        return popped
+
+    def position(self, user_id):
+        ticket = self.members.get(user_id)
+        if ticket is None:
+            return None
+        return self.prefix_count(ticket)
@@ -0,0 +1,120 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Matches are stamped with the last mmr_history id written before them, and
+# penalties are mmr_history rows, so history ids give the live write order when
+# timestamps tie. Matches saved before that stamp existed sort after penalties.
+def build_events(match_rows, penalty_rows):
+    events = []
+
+    for team1, team2, winner, created_at, history_seq in match_rows:
+        if team1 and team2 and winner in (1, 2):
+            seq = history_seq if history_seq is not None else float('inf')
+            events.append((created_at, seq, 1, ('match', team1, team2, winner)))
+
+    for user_id, changed_at, history_id in penalty_rows:
+        events.append((changed_at, history_id, 0, ('penalty', user_id)))
+
+    events.sort(key=lambda event: event[:3])
+    return [event[3] for event in events]
+
+def build_waves(events):
+    # Consecutive events that share no players cannot affect each other, so each
+    # run of them is applied as one vectorised step.
+    waves = []
+    wave = []
+    seen = set()
+
+    for event in events:
+        players = event[1] + event[2] if event[0] == 'match' else [event[1]]
+        if seen.intersection(players):
+            waves.append(wave)
+            wave = []
+            seen = set()
+        wave.append(event)
+        seen.update(players)
+
+    if wave:
+        waves.append(wave)
+    return waves
+
+def replay(events, k_factor, variance, penalty, start_mmr=500):
+    if np is None:
+        raise RuntimeError("Rating replay needs numpy installed (pip install numpy)")
+
+    index = {}
+    for event in events:
+        players = event[1] + event[2] if event[0] == 'match' else [event[1]]
+        for player_id in players:
+            index.setdefault(player_id, len(index))
+
+    ratings = np.full(len(index), start_mmr, dtype=np.int64)
+    games = np.zeros(len(index), dtype=np.int64)
+    wins = np.zeros(len(index), dtype=np.int64)
+    variance_factor = variance / 1600
+
+    waves = build_waves(events)
+    match_count = 0
+    penalty_count = 0
+
+    for wave in waves:
+        players = []
+        slots = []
+        scores = []
+        penalised = []
+        wave_matches = 0
+
+        for event in wave:
+            if event[0] == 'penalty':
+                penalised.append(index[event[1]])
+                continue
+
+            _, team1, team2, winner = event
+            slot = 2 * wave_matches
+            for player_id in team1:
+                players.append(index[player_id])
+                slots.append(slot)
+                scores.append(1.0 if winner == 1 else 0.0)
+            for player_id in team2:
+                players.append(index[player_id])
+                slots.append(slot + 1)
+                scores.append(1.0 if winner == 2 else 0.0)
+            wave_matches += 1
+
+        if players:
+            players = np.array(players)
+            slots = np.array(slots)
+            scores = np.array(scores)
+
+            # Team averages are per (match, team) slot; slot ^ 1 is the opposing team.
+            current = ratings[players].astype(np.float64)
+            totals = np.bincount(slots, weights=current, minlength=2 * wave_matches)
+            sizes = np.bincount(slots, minlength=2 * wave_matches)
+            opponents = totals[slots ^ 1] / sizes[slots ^ 1]
+
+            expected = 1 / (1 + np.power(10.0, (opponents - current) / 400))
+            changes = np.round(k_factor * (scores - expected) / variance_factor).astype(np.int64)
+
+            ratings[players] = np.maximum(0, ratings[players] + changes)
+            games[players] += 1
+            wins[players] += scores.astype(np.int64)
+            match_count += wave_matches
+
+        if penalised:
+            penalised = np.array(penalised)
+            ratings[penalised] = np.maximum(0, ratings[penalised] - penalty)
+            penalty_count += len(penalised)
+
+    results = {
+        player_id: (int(ratings[i]), int(games[i]), int(wins[i]), int(games[i] - wins[i]))
+        for player_id, i in index.items()
+    }
+    summary = {
+        'matches': match_count,
+        'penalties': penalty_count,
+        'players': len(index),
+        'waves': len(waves)
+    }
+    return results, summary
@@ -0,0 +1,129 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+CRITICAL = 0
+NORMAL = 1
+COSMETIC = 2
+BACKGROUND = 3
+
+PRIORITY_NAMES = {
+    CRITICAL: "critical",
+    NORMAL: "normal",
+    COSMETIC: "cosmetic",
+    BACKGROUND: "background"
+}
+
+class RestScheduler:
+    def __init__(self, concurrency=8, metrics=None):
+        self.concurrency = concurrency
+        self.metrics = metrics
+        self.heap = []
+        self.keyed = {}
+        self.sequence = itertools.count()
+        self.ready = None
+        self.workers = []
+        self.queued = {priority: 0 for priority in PRIORITY_NAMES}
+
+    def start(self):
+        if self.workers:
+            return
+        self.ready = asyncio.Condition()
+        self.workers = [asyncio.create_task(self.work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+
+        for _, _, entry in self.heap:
+            for future in entry['futures']:
+                if not future.done():
+                    future.cancel()
+        self.heap = []
+        self.keyed.clear()
+
+    # factory is called when a worker picks the request up, not when it is
+    # submitted, so an edit that waited in the queue still sends the newest
+    # content. A keyed request that is still waiting is replaced instead of
+    # queued twice, and every caller gets the result of the one that ran.
+    async def request(self, factory, priority=NORMAL, key=None):
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+
+        entry = self.keyed.get(key) if key is not None else None
+        if entry is not None:
+            entry['factory'] = factory
+            entry['futures'].append(future)
+            if priority < entry['priority']:
+                self.queued[entry['priority']] -= 1
+                self.queued[priority] += 1
+                entry['priority'] = priority
+                heapq.heappush(self.heap, (priority, next(self.sequence), entry))
+        else:
+            entry = {
+                'factory': factory,
+                'futures': [future],
+                'priority': priority,
+                'key': key,
+                'queued_at': time.perf_counter(),
+                'started': False
+            }
+            if key is not None:
+                self.keyed[key] = entry
+            self.queued[priority] += 1
+            heapq.heappush(self.heap, (priority, next(self.sequence), entry))
+
+        async with self.ready:
+            self.ready.notify()
+
+        return await asyncio.shield(future)
+
+    def next_entry(self):
+        while self.heap:
+            _, _, entry = heapq.heappop(self.heap)
+            if not entry['started']:
+                return entry
+        return None
+
+    async def work(self):
+        while True:
+            async with self.ready:
+                entry = self.next_entry()
+                while entry is None:
+                    await self.ready.wait()
+                    entry = self.next_entry()
+
+            entry['started'] = True
+            if entry['key'] is not None:
+                self.keyed.pop(entry['key'], None)
+
+            self.queued[entry['priority']] -= 1
+            started_at = time.perf_counter()
+            waited = started_at - entry['queued_at']
+            if self.metrics is not None:
+                self.metrics.observe("multiverse_rest_wait_seconds", waited, priority=PRIORITY_NAMES[entry['priority']])
+
+            try:
+                result = await entry['factory']()
+            except asyncio.CancelledError:
+                for future in entry['futures']:
+                    if not future.done():
+                        future.cancel()
+                raise
+            except Exception as e:
+                for future in entry['futures']:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future in entry['futures']:
+                    if not future.done():
+                        future.set_result(result)
+
+            elapsed = time.perf_counter() - started_at
+            if self.metrics is not None:
+                self.metrics.observe("multiverse_rest_request_seconds", elapsed, priority=PRIORITY_NAMES[entry['priority']])
+
+    def depth(self):
+        return sum(self.queued.values())
@@ -0,0 +1,112 @@
+import asyncio
+import heapq
+import itertools
+import json
+import time
+
+class Scheduler:
+    def __init__(self, db):
+        self.db = db
+        self.heap = []
+        self.entries = {}
+        self.handlers = {}
+        self.sequence = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.task = None
+        # The event loop only keeps weak references to tasks, and a fired
+        # deadline is already gone from the table, so hold on to it until done.
+        self.firing = set()
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    async def start(self):
+        for key, kind, due_at, payload in await self.db.get_deadlines():
+            self.push(key, kind, due_at, json.loads(payload))
+
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def push(self, key, kind, due_at, payload):
+        entry = {
+            'key': key,
+            'kind': kind,
+            'due_at': due_at,
+            'payload': payload,
+            'seq': next(self.sequence)
+        }
+        self.entries[key] = entry
+        heapq.heappush(self.heap, (due_at, entry['seq'], key))
+        self.wakeup.set()
+        return entry
+
+    async def schedule(self, key, kind, delay, payload=None):
+        # Rescheduling an existing key replaces it; the old heap slot is skipped
+        # when it surfaces because its sequence number no longer matches.
+        due_at = time.time() + delay
+        payload = payload or {}
+        self.push(key, kind, due_at, payload)
+        await self.db.save_deadline(key, kind, due_at, json.dumps(payload))
+        return due_at
+
+    async def cancel(self, key):
+        if self.entries.pop(key, None) is None:
+            return False
+        await self.db.delete_deadline(key)
+        return True
+
+    def pending(self):
+        return sorted(
+            ({'key': entry['key'], 'kind': entry['kind'], 'due_at': entry['due_at']} for entry in self.entries.values()),
+            key=lambda entry: entry['due_at']
+        )
+
+    def next_entry(self):
+        while self.heap:
+            due_at, seq, key = self.heap[0]
+            entry = self.entries.get(key)
+            if entry is not None and entry['seq'] == seq:
+                return entry
+            heapq.heappop(self.heap)
+        return None
+
+    async def run(self):
+        while True:
+            self.wakeup.clear()
+            entry = self.next_entry()
+            delay = None if entry is None else entry['due_at'] - time.time()
+
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.heap)
+            del self.entries[entry['key']]
+            task = asyncio.create_task(self.fire(entry))
+            self.firing.add(task)
+            task.add_done_callback(self.firing.discard)
+
+    # The row is only deleted once the handler has finished, so a crash midway
+    # fires it again on the next start. A handler that scheduled the same key
+    # again keeps the new row.
+    async def fire(self, entry):
+        try:
+            handler = self.handlers.get(entry['kind'])
+            if handler is None:
+                print(f"No handler registered for scheduled {entry['kind']} ({entry['key']})")
+            else:
+                await handler(entry['payload'])
+        except Exception as e:
+            print(f"Scheduled {entry['kind']} ({entry['key']}) failed: {e}")
+            return
+
+        if entry['key'] not in self.entries:
+            await self.db.delete_deadline(entry['key'])
@@ -0,0 +1,144 @@
+from collections import namedtuple
+from itertools import combinations
+
+# Above this many players the number of splits grows too quickly to enumerate
+# on every match start, so balance_teams falls back to the greedy split.
+MAX_EXACT_PLAYERS = 16
+
+# Objectives score a split from each team's size, MMR total and total of
+# squared MMRs. Those come straight out of the enumeration, so no objective
+# has to build per-split MMR lists.
+Team = namedtuple("Team", ["size", "total", "squares"])
+
+# Skips namedtuple's Python-level __new__, which is most of the cost of
+# building the two Teams for each candidate.
+new_team = tuple.__new__
+
+def team_of(mmrs):
+    return Team(len(mmrs), sum(mmrs), sum(mmr * mmr for mmr in mmrs))
+
+def average_difference(team1, team2):
+    return abs(team1.total / team1.size - team2.total / team2.size)
+
+def variance(team):
+    mean = team.total / team.size
+    return team.squares / team.size - mean * mean
+
+def variance_difference(team1, team2):
+    return abs(variance(team1) - variance(team2)) ** 0.5
+
+def weighted(*objectives):
+    def objective(team1, team2):
+        score = 0
+        for func, weight in objectives:
+            score += weight * func(team1, team2)
+        return score
+    return objective
+
+def keep_together(groups):
+    groups = [set(group) for group in groups if len(group) > 1]
+
+    def constraint(team1, team2):
+        return all(group <= team1 or group <= team2 for group in groups)
+    return constraint
+
+def spread_roles(roles):
+    def constraint(team1, team2):
+        counts = {}
+        for player_id in team1:
+            role = roles.get(player_id)
+            if role is not None:
+                counts[role] = counts.get(role, 0) + 1
+        for player_id in team2:
+            role = roles.get(player_id)
+            if role is not None:
+                counts[role] = counts.get(role, 0) - 1
+        return all(abs(count) <= 1 for count in counts.values())
+    return constraint
+
+def greedy_split(player_mmrs):
+    player_mmrs = sorted(player_mmrs, key=lambda x: x[1], reverse=True)
+
+    team1 = []
+    team2 = []
+    team1_mmr = 0
+    team2_mmr = 0
+
+    for player_id, mmr in player_mmrs:
+        if team1_mmr <= team2_mmr:
+            team1.append(player_id)
+            team1_mmr += mmr
+        else:
+            team2.append(player_id)
+            team2_mmr += mmr
+
+    return team1, team2
+
+def best_split(player_mmrs, objective=average_difference, constraints=()):
+    count = len(player_mmrs)
+    team_size = count // 2
+    player_ids = [player_id for player_id, _ in player_mmrs]
+    mmrs = [mmr for _, mmr in player_mmrs]
+    squares = [mmr * mmr for mmr in mmrs]
+    total = sum(mmrs)
+    total_squares = sum(squares)
+
+    def split(team1_indexes):
+        team1 = set(team1_indexes)
+        return team1_indexes, tuple(i for i in range(count) if i not in team1)
+
+    def allowed(team1_indexes, team2_indexes):
+        team1 = {player_ids[i] for i in team1_indexes}
+        team2 = {player_ids[i] for i in team2_indexes}
+        return all(constraint(team1, team2) for constraint in constraints)
+
+    best = None
+    best_score = None
+    fallback = None
+    fallback_score = None
+
+    # Pinning the first player to team 1 skips every mirrored split, which
+    # leaves C(9, 4) = 126 candidates for a 10-player match. The index, MMR and
+    # squared MMR combinations are generated in the same order, so each
+    # candidate's team totals are two sums over team_size - 1 values.
+    candidates = zip(
+        combinations(range(1, count), team_size - 1),
+        combinations(mmrs[1:], team_size - 1),
+        combinations(squares[1:], team_size - 1)
+    )
+    for rest, rest_mmrs, rest_squares in candidates:
+        team1_total = mmrs[0] + sum(rest_mmrs)
+
+        if objective is average_difference:
+            score = abs(2 * team1_total - total) / team_size
+        else:
+            team1_squares = squares[0] + sum(rest_squares)
+            score = objective(
+                new_team(Team, (team_size, team1_total, team1_squares)),
+                new_team(Team, (count - team_size, total - team1_total, total_squares - team1_squares))
+            )
+
+        if fallback_score is None or score < fallback_score:
+            fallback = (0,) + rest
+            fallback_score = score
+
+        # Constraints are only checked for splits that would beat the current
+        # best, which keeps them off the hot path for most candidates.
+        if best_score is not None and score >= best_score:
+            continue
+        if constraints and not allowed(*split((0,) + rest)):
+            continue
+
+        best = (0,) + rest
+        best_score = score
+
+    if best is None:
+        print(f"No split of {player_ids} satisfies every team constraint, balancing without them")
+
+    team1_indexes, team2_indexes = split(best if best is not None else fallback)
+    return [player_ids[i] for i in team1_indexes], [player_ids[i] for i in team2_indexes]
+
+def balance(player_mmrs, objective=average_difference, constraints=()):
+    if len(player_mmrs) < 2 or len(player_mmrs) % 2 or len(player_mmrs) > MAX_EXACT_PLAYERS:
+        return greedy_split(player_mmrs)
+    return best_split(player_mmrs, objective, constraints)
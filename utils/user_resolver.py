@@ -0,0 +1,91 @@
+import asyncio
+import time
+import discord
+from collections import OrderedDict
+from utils.rest_scheduler import COSMETIC
+
+class UserResolver:
+    def __init__(self, bot, max_size=2048, ttl=600):
+        self.bot = bot
+        self.max_size = max_size
+        self.ttl = ttl
+        self.profiles = OrderedDict()
+        self.inflight = {}
+
+    def profile_of(self, user):
+        return {
+            'name': user.display_name,
+            'avatar_url': user.display_avatar.url
+        }
+
+    def get_cached(self, user_id):
+        entry = self.profiles.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, profile = entry
+        if time.monotonic() > expires_at:
+            del self.profiles[user_id]
+            return None
+
+        self.profiles.move_to_end(user_id)
+        return entry
+
+    def store(self, user_id, profile):
+        self.profiles[user_id] = (time.monotonic() + self.ttl, profile)
+        self.profiles.move_to_end(user_id)
+        while len(self.profiles) > self.max_size:
+            self.profiles.popitem(last=False)
+
+    async def fetch(self, user_id):
+        try:
+            user = await self.bot.rest.request(lambda: self.bot.fetch_user(user_id), COSMETIC)
+        except discord.NotFound:
+            # Deleted accounts stay deleted, so remember them like any other profile.
+            self.store(user_id, None)
+            return None
+
+        profile = self.profile_of(user)
+        self.store(user_id, profile)
+        return profile
+
+    async def resolve(self, user_ids, guild=None):
+        profiles = {}
+        missing = []
+
+        # Members and users the gateway already gave us cost nothing to look up,
+        # so only ids outside both caches and the LRU go out as REST calls.
+        for user_id in user_ids:
+            entry = self.get_cached(user_id)
+            if entry is not None:
+                profiles[user_id] = entry[1]
+                continue
+
+            user = (guild.get_member(user_id) if guild else None) or self.bot.get_user(user_id)
+            if user is not None:
+                profiles[user_id] = self.profile_of(user)
+                self.store(user_id, profiles[user_id])
+                continue
+
+            missing.append(user_id)
+
+        tasks = []
+        for user_id in missing:
+            task = self.inflight.get(user_id)
+            if task is None:
+                task = asyncio.ensure_future(self.fetch(user_id))
+                self.inflight[user_id] = task
+                task.add_done_callback(lambda _, user_id=user_id: self.inflight.pop(user_id, None))
+            tasks.append(asyncio.shield(task))
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for user_id, result in zip(missing, results):
+            if isinstance(result, Exception):
+                print(f"Failed to resolve user {user_id}: {result}")
+                result = None
+            profiles[user_id] = result
+
+        return profiles
+
+    def invalidate(self, user_id):
+        self.profiles.pop(user_id, None)